@@ -1,13 +1,65 @@
 # 3V Engine - Forex Multi-Agent System
 # Agent exports
 
+import asyncio
+from typing import Any
+
+from core.config import settings
+from core.llm_client import _neutral_signal
 from agents.quant_analyst import quant_analyst
 from agents.sentiment_pulse import sentiment_pulse
 from agents.macro_watcher import macro_watcher
 from agents.risk_commander import risk_commander
 from agents.execution_handler import execution_handler
 
+# Analistas independentes: só leem o market_state bruto, podem rodar juntos.
+# @Risk_Commander e @Execution_Handler consomem as saídas deles e ficam de
+# fora (rodam depois, pelo orquestrador).
+ANALYSTS = [
+    quant_analyst,
+    sentiment_pulse,
+    macro_watcher
+]
+
+
+async def run_all(
+    market_state: dict[str, Any],
+    agents: list | None = None
+) -> dict[str, Any]:
+    """
+    Executa analyze() de vários analistas em paralelo.
+    
+    A latência da rodada passa a ser a do agente mais lento (e não a soma).
+    Um semáforo (settings.agent_concurrency) limita chamadas simultâneas
+    para respeitar o rate limit dos provedores. Cada agente tem até
+    agent.TIMEOUT_S segundos; se estourar, entra um sinal NEUTRAL.
+    
+    Args:
+        market_state: Estado do mercado compartilhado
+        agents: Analistas a executar (default: ANALYSTS). Só agentes que não
+            dependem da saída uns dos outros.
+    
+    Returns:
+        Dict nome do agente -> resultado (ou a exceção levantada)
+    """
+    agents = ANALYSTS if agents is None else agents
+    semaphore = asyncio.Semaphore(settings.agent_concurrency)
+    
+    async def _run(agent):
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(agent.analyze(market_state), timeout=agent.TIMEOUT_S)
+            except asyncio.TimeoutError:
+                agent.log(f"Analysis timed out after {agent.TIMEOUT_S:.0f}s", level="warning")
+                return _neutral_signal("timeout", f"Timed out after {agent.TIMEOUT_S:.0f}s")
+    
+    results = await asyncio.gather(*(_run(agent) for agent in agents), return_exceptions=True)
+    return dict(zip((agent.name for agent in agents), results))
+
+
 __all__ = [
+    "ANALYSTS",
+    "run_all",
     "quant_analyst",
     "sentiment_pulse",
     "macro_watcher",
@@ -0,0 +1,26 @@
+"""
+3V Engine - Optional Numba JIT
+===============================
+Decorator @njit opcional para helpers numéricos dos agentes.
+
+Se o numba estiver instalado, usa numba.njit; caso contrário vira no-op
+e a função roda em Python puro, com o mesmo resultado.
+
+Uso (quant_analyst, macro_watcher, ...): extraia o cálculo numérico para
+uma função de módulo, só com escalares/arrays numpy, e decore com
+@njit(cache=True). O cache=True grava o código compilado em __pycache__
+e evita pagar a compilação (dezenas de segundos) a cada restart.
+"""
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback sem numba: devolve a função original."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
@@ -0,0 +1,87 @@
+"""
+3V Engine - Quant Kernels
+==========================
+Núcleo numérico do sinal determinístico do @Quant_Analyst.
+
+Só recebe/retorna escalares (int/float) para poder ser compilado com
+@njit; sem numba roda em Python puro (ver agents/_njit.py).
+"""
+
+from agents._njit import njit
+
+# Bits de reason_mask: quais regras pontuaram (texto montado no agente)
+REASON_TREND = 1 << 0
+REASON_RSI_CONFIRM = 1 << 1
+REASON_RSI_MOMENTUM = 1 << 2
+REASON_RSI_OVERSOLD = 1 << 3
+REASON_RSI_LOW = 1 << 4
+REASON_RSI_OVERBOUGHT = 1 << 5
+REASON_RSI_HIGH = 1 << 6
+REASON_BB = 1 << 7
+
+
+@njit(cache=True)
+def score_kernel(t, ma_score, rsi, b):
+    """
+    Pontua tendência (MAs), RSI e Bollinger.
+    
+    Args:
+        t: Tendência das MAs (1 = BULLISH, -1 = BEARISH, 0 = NEUTRAL)
+        ma_score: trend_score das MAs
+        rsi: Valor do RSI (NaN = indisponível)
+        b: Posição nas Bollinger (-2 BELOW_LOWER ... 2 ABOVE_UPPER, 0 = meio)
+    
+    Returns:
+        Tuple[signal (1/-1/0), confidence, reason_mask]
+    """
+    score = 0
+    mask = 0
+    
+    # MODO AGRESSIVO: trend forte a partir de |score| >= 2
+    strong_trend = abs(ma_score) >= 2
+    
+    # 1. TENDÊNCIA DAS MAs (PESO DOMINANTE)
+    if t != 0:
+        score += t * (3 if strong_trend else 2)
+        mask |= REASON_TREND
+    
+    # 2. RSI (rsi != rsi => NaN, RSI indisponível)
+    if rsi == rsi:
+        if strong_trend:
+            # TREND-FOLLOWING: RSI extremo = momentum forte
+            if t * (rsi - 50.0) >= 0 and t != 0:
+                score += t
+                mask |= REASON_RSI_CONFIRM
+            if (t == 1 and rsi >= 60) or (t == -1 and rsi <= 40):
+                score += t
+                mask |= REASON_RSI_MOMENTUM
+        elif rsi <= 30:
+            score += 2
+            mask |= REASON_RSI_OVERSOLD
+        elif rsi <= 45:
+            score += 1
+            mask |= REASON_RSI_LOW
+        elif rsi >= 70:
+            score -= 2
+            mask |= REASON_RSI_OVERBOUGHT
+        elif rsi >= 55:
+            score -= 1
+            mask |= REASON_RSI_HIGH
+    
+    # 3. BOLLINGER BANDS (timing de entrada)
+    if strong_trend:
+        # Banda a favor da tendência indica força, não reversão
+        if t * b > 0:
+            score += t
+            mask |= REASON_BB
+    elif b != 0:
+        # Reversão à média
+        score -= b
+        mask |= REASON_BB
+    
+    # MODO AGRESSIVO: threshold baixo para mais operações
+    if score >= 1:
+        return 1, min(60 + score * 8, 95), mask
+    if score <= -1:
+        return -1, min(60 - score * 8, 95), mask
+    return 0, 40, mask
@@ -5,21 +5,75 @@ Classe abstrata base para todos os agentes do sistema.
 Define interface comum e integração com LLM.
 """
 
+import asyncio
+import logging
+import random
+import time
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import Callable
+from contextvars import ContextVar
+from hashlib import blake2b
+from typing import Any, ClassVar
 
-from pydantic import BaseModel
+import httpx
+import orjson
 
-from core.llm_client import llm_client
-from utils.logger import log_agent_action
+from core.config import settings
+from core.llm_client import AgentSignal, _neutral_signal, build_agent_system_prompt, llm_client
+from utils.logger import logger
 
 
-class AgentSignal(BaseModel):
-    """Sinal padrão emitido por um agente."""
-    signal: str  # BULLISH, BEARISH, NEUTRAL
-    confidence_score: int  # 0-100
-    analysis: str
-    key_factors: list[str]
+# Cache de raciocínio por rodada de análise: chave -> task do LLM.
+# Chamadas concorrentes com os mesmos dados aguardam a mesma requisição.
+_TICK_CACHE: ContextVar[dict[str, asyncio.Task] | None] = ContextVar("_TICK_CACHE", default=None)
+
+
+def start_tick() -> None:
+    """Inicia um cache de raciocínio novo para a rodada de análise atual."""
+    _TICK_CACHE.set({})
+
+
+def _compact(
+    data: Any,
+    max_list_len: int,
+    exclude_keys: frozenset[str],
+    float_digits: int
+) -> Any:
+    """
+    Reduz dados antes de enviá-los ao LLM.
+    
+    Remove chaves de exclude_keys, trunca listas longas em max_list_len
+    itens e arredonda floats em float_digits casas (recursivo).
+    """
+    if isinstance(data, dict):
+        return {
+            key: _compact(value, max_list_len, exclude_keys, float_digits)
+            for key, value in data.items()
+            if key not in exclude_keys
+        }
+    if isinstance(data, (list, tuple)):
+        return [
+            _compact(value, max_list_len, exclude_keys, float_digits)
+            for value in data[:max_list_len]
+        ]
+    if isinstance(data, float):
+        return round(data, float_digits)
+    return data
+
+
+# Nome do nível (self.log(level=...)) -> número do logging
+_LOG_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "critical": logging.CRITICAL,
+}
+
+
+# Circuit breaker compartilhado: todos os agentes usam o mesmo provedor LLM
+_breaker_failures = 0
+_breaker_open_until = 0.0
 
 
 class BaseAgent(ABC):
@@ -30,10 +84,58 @@ class BaseAgent(ABC):
     - name: Nome do agente (ex: @Quant_Analyst)
     - role: Descrição do papel do agente
     - analyze(): Método principal de análise
+    
+    Subclasses podem sobrescrever model_tier ("main" ou "fast") para
+    rotear o raciocínio a um modelo menor e mais rápido.
     """
     
+    # Sem __dict__ por instância: subclasses declaram seus próprios __slots__
+    __slots__ = (
+        "_llm",
+        "_name",
+        "_role",
+        "_prompt_cache_key",
+        "_system_prompt",
+        "_logger",
+        "_log_prefix",
+    )
+    
+    model_tier: str = "main"
+    
+    # Retry do LLM com backoff exponencial + jitter
+    LLM_MAX_ATTEMPTS = 3
+    LLM_BACKOFF_MIN = 0.2  # segundos
+    LLM_BACKOFF_MAX = 4.0  # segundos
+    
+    # Circuit breaker: falhas consecutivas (já com retries) até abrir o circuito
+    BREAKER_THRESHOLD = 5
+    BREAKER_COOLDOWN = 60.0  # segundos com o circuito aberto
+    
+    # Limite de tempo de analyze() por rodada (run_all / orquestrador).
+    # Folga para as várias chamadas à Twelve Data + LLM do @Quant_Analyst
+    TIMEOUT_S: ClassVar[float] = 45.0
+    
+    # Compactação dos dados enviados ao LLM (summarize_for_llm)
+    MAX_LIST_LEN: ClassVar[int] = 32
+    EXCLUDE_KEYS: ClassVar[frozenset[str]] = frozenset()
+    FLOAT_DIGITS: ClassVar[int] = 5  # 5 casas preservam o pipette do Forex
+    
+    # Kernels numéricos (@njit) executados em warmup(): (função, args representativos).
+    # Módulos dos agentes registram com BaseAgent._WARMUP_KERNELS.append(...)
+    _WARMUP_KERNELS: ClassVar[list[tuple[Callable[..., Any], tuple]]] = []
+    
     def __init__(self) -> None:
         self._llm = llm_client
+        # name/role resolvidos uma vez; caminhos quentes usam _name/_role
+        self._name = self.name
+        self._role = self.role
+        # Chave estável (nome + hash do papel) para prompt caching do provedor
+        self._prompt_cache_key = f"{self._name}:{blake2b(self._role.encode(), digest_size=8).hexdigest()}"
+        # Prompt de sistema renderizado uma vez (agentes são singletons)
+        self._system_prompt = build_agent_system_prompt(self._name, self._role)
+        # Logger com o agente já vinculado (evita reconstruir o contexto a cada log)
+        self._logger = logger.bind(agent=self._name)
+        self._log_prefix = f"{self._name} - "
     
     @property
     @abstractmethod
@@ -60,23 +162,151 @@ class BaseAgent(ABC):
         """
         pass
     
-    async def reason(self, data: dict[str, Any]) -> dict[str, Any]:
+    def summarize_for_llm(self, data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Compacta os dados antes do prompt (menos tokens de prefill).
+        
+        Padrão: remove EXCLUDE_KEYS, trunca listas em MAX_LIST_LEN e arredonda
+        floats em FLOAT_DIGITS. Subclasses podem sobrescrever os ClassVars ou
+        este método para manter campos relevantes ao seu domínio.
+        """
+        return _compact(data, self.MAX_LIST_LEN, self.EXCLUDE_KEYS, self.FLOAT_DIGITS)
+    
+    async def reason(
+        self,
+        data: dict[str, Any] | None = None,
+        on_partial: Callable[[dict[str, Any]], None] | None = None,
+        **inputs: Any
+    ) -> dict[str, Any]:
         """
         Usa LLM para raciocínio sobre os dados.
         
+        Dentro de uma rodada (start_tick), chamadas repetidas com os mesmos
+        dados reaproveitam a mesma requisição ao LLM.
+        
         Args:
             data: Dados para análise pelo LLM
+            on_partial: Callback com {signal, confidence_score} assim que esses
+                campos chegam no streaming, antes da resposta completa (opcional)
+            **inputs: Alternativa a data: os campos passados como kwargs viram
+                o próprio dict de dados (sem montar um dict no chamador)
         
         Returns:
             Análise estruturada do LLM
         """
-        log_agent_action(self.name, "Reasoning with LLM")
-        return await self._llm.analyze(
-            agent_name=self.name,
-            agent_role=self.role,
-            market_data=data
-        )
+        data = self.summarize_for_llm(inputs if data is None else data)
+        
+        cache = _TICK_CACHE.get()
+        if cache is None or on_partial is not None:
+            # Com on_partial a chamada é exclusiva (o callback é deste chamador)
+            self.log("Reasoning with LLM")
+            return await self._analyze_with_retry(data, on_partial)
+        
+        key = blake2b(
+            orjson.dumps(
+                data,
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+                default=str
+            ) + self._name.encode()
+        ).hexdigest()
+        
+        task = cache.get(key)
+        if task is None:
+            self.log("Reasoning with LLM")
+            task = asyncio.create_task(self._analyze_with_retry(data))
+            cache[key] = task
+        
+        return await task
+    
+    async def _analyze_with_retry(
+        self,
+        data: dict[str, Any],
+        on_partial: Callable[[dict[str, Any]], None] | None = None
+    ) -> dict[str, Any]:
+        """
+        Chamada ao LLM com retry (backoff exponencial + jitter) e circuit breaker.
+        
+        Erros transitórios (429, 5xx, timeouts, falhas de transporte) são
+        repetidos até LLM_MAX_ATTEMPTS. Se a chamada falhar de vez, ou o
+        circuito estiver aberto, retorna um sinal NEUTRAL para não derrubar
+        a rodada inteira.
+        """
+        global _breaker_failures, _breaker_open_until
+        
+        if time.monotonic() < _breaker_open_until:
+            self.log("LLM circuit open, returning NEUTRAL", level="warning")
+            return _neutral_signal("LLM indisponível (circuit breaker aberto)", "LLM circuit open")
+        
+        last_error: Exception | None = None
+        for attempt in range(1, self.LLM_MAX_ATTEMPTS + 1):
+            try:
+                result = await self._llm.analyze(
+                    agent_name=self._name,
+                    agent_role=self._role,
+                    market_data=data,
+                    prompt_cache_key=self._prompt_cache_key,
+                    model=self._llm.models[self.model_tier],
+                    on_partial=on_partial,
+                    system_prompt=self._system_prompt
+                )
+                _breaker_failures = 0
+                return result
+            except httpx.HTTPError as e:
+                last_error = e
+                retryable = (
+                    not isinstance(e, httpx.HTTPStatusError)
+                    or e.response.status_code == 429
+                    or e.response.status_code >= 500
+                )
+                if not retryable or attempt == self.LLM_MAX_ATTEMPTS:
+                    break
+                
+                delay = random.uniform(
+                    self.LLM_BACKOFF_MIN,
+                    min(self.LLM_BACKOFF_MAX, self.LLM_BACKOFF_MIN * 2 ** attempt)
+                )
+                self.log(
+                    f"LLM call failed ({e}), retry {attempt}/{self.LLM_MAX_ATTEMPTS - 1} in {delay:.2f}s",
+                    level="warning"
+                )
+                await asyncio.sleep(delay)
+        
+        _breaker_failures += 1
+        if _breaker_failures >= self.BREAKER_THRESHOLD:
+            _breaker_open_until = time.monotonic() + self.BREAKER_COOLDOWN
+            self.log(
+                f"LLM circuit opened for {self.BREAKER_COOLDOWN:.0f}s after {_breaker_failures} failures",
+                level="error"
+            )
+        
+        self.log(f"LLM call failed: {last_error}", level="error")
+        return _neutral_signal(f"LLM indisponível: {last_error}", "LLM call failed")
+    
+    @classmethod
+    async def warmup(cls) -> None:
+        """
+        Aquece dependências antes da primeira rodada de análise.
+        
+        Abre a conexão com o LLM (llm_client.ping) e, em paralelo, executa uma
+        vez cada kernel de _WARMUP_KERNELS para carregar/compilar o JIT fora
+        do caminho crítico.
+        """
+        def run_kernels() -> None:
+            for kernel, args in cls._WARMUP_KERNELS:
+                kernel(*args)
+        
+        await asyncio.gather(llm_client.ping(), asyncio.to_thread(run_kernels))
+    
+    def log_enabled(self, level: str = "info") -> bool:
+        """
+        Indica se o nível de log está habilitado.
+        
+        Use antes de self.log() com dict de dados caro de montar, para não
+        alocá-lo quando o nível estiver filtrado (ex: LOG_LEVEL=WARNING).
+        """
+        return self._logger.is_enabled_for(_LOG_LEVELS.get(level, logging.INFO))
     
     def log(self, action: str, data: dict | None = None, level: str = "info") -> None:
-        """Log facilitado para o agente."""
-        log_agent_action(self.name, action, data, level)
+        """Log facilitado para o agente (mesmo formato de log_agent_action)."""
+        log_func = getattr(self._logger, level, self._logger.info)
+        log_func(self._log_prefix + action, action=action, **(data or {}))
@@ -9,13 +9,23 @@ No macOS/Linux, opera em modo simulação (loga sem executar).
 """
 
 import asyncio
+import contextlib
+import itertools
+import random
 import sys
+import time
 from datetime import datetime, date
+from types import MappingProxyType
+from collections.abc import Callable
 from typing import Any, Literal
 
+import numpy as np
+
 from agents.base import BaseAgent
 from core.supabase_client import supabase_client
 from utils.logger import log_agent_action
+from utils.telegram_bot import telegram_bot
+from utils.twelve_data import twelve_data_client
 
 # Tenta importar MetaTrader5 (só disponível no Windows)
 MT5_AVAILABLE = False
@@ -28,6 +38,358 @@ except ImportError:
 
 TradeDirection = Literal["LONG", "SHORT"]
 
+# Notificação Telegram de trade fechado por TP/SL
+_CLOSE_MSG_TMPL = """{emoji} <b>3V ENGINE - {header}</b>
+━━━━━━━━━━━━━━━━━
+
+📊 <b>Par:</b> {symbol}
+📈 <b>Direção:</b> {direction}
+
+💵 <b>Entrada:</b> {entry:.5f}
+🎯 <b>Saída:</b> {exit:.5f}
+
+{color} <b>Resultado:</b> ${profit:.2f}
+🎫 <b>Ticket:</b> #{ticket}
+
+🕐 {time} (GMT-3)
+━━━━━━━━━━━━━━━━━
+<code>3V Engine • Trade Fechado</code>"""
+
+# Respostas do modo simulação (só ticket/timestamp/etc. variam por chamada)
+_SIM_ACCOUNT_TMPL = MappingProxyType({
+    "mode": "SIMULATION",
+    "balance": 10000.0,
+    "equity": 10000.0,
+    "margin": 0.0,
+    "free_margin": 10000.0,
+    "daily_pnl_percent": 0.0,
+    "open_positions": 0
+})
+_SIM_ORDER_TMPL = MappingProxyType({
+    "success": True,
+    "mode": "SIMULATION",
+    "volume": 0.01,
+    "price": 1.08500  # Preço simulado
+})
+_SIM_CLOSE_TMPL = MappingProxyType({
+    "success": True,
+    "mode": "SIMULATION",
+    "message": "Simulated close"
+})
+_SIM_TRAILING_TMPL = MappingProxyType({
+    "success": True,
+    "mode": "SIMULATION",
+    "message": "Trailing stop updated"
+})
+
+
+def _mt5_initialize() -> Any:
+    """initialize + account_info numa só ida à thread do MT5 (last_error sem corrida)."""
+    if not mt5.initialize():
+        raise ConnectionError(f"MT5 initialize failed: {mt5.last_error()}")
+    return mt5.account_info()
+
+
+class _LiveExecutor:
+    """Execução real no MT5 (estado e helpers ficam no ExecutionHandlerAgent)."""
+    
+    __slots__ = ("_handler",)
+    
+    def __init__(self, handler: "ExecutionHandlerAgent") -> None:
+        self._handler = handler
+    
+    async def get_account_info(self) -> dict[str, Any]:
+        h = self._handler
+        
+        if h._account_cache is not None:
+            cached, checked_at = h._account_cache
+            if time.monotonic() - checked_at < h.ACCOUNT_TTL:
+                return cached
+        
+        if not h._connected:
+            await h.connect()
+        
+        try:
+            account = await h._mt5(mt5.account_info)
+            if account is None:
+                raise ValueError("Failed to get account info")
+            
+            # Calcula P&L diário
+            daily_pnl_percent = (h._daily_pnl / account.balance * 100) if account.balance > 0 else 0
+            
+            info = {
+                "mode": "LIVE",
+                "balance": account.balance,
+                "equity": account.equity,
+                "margin": account.margin,
+                "free_margin": account.margin_free,
+                "profit": account.profit,
+                "daily_pnl": h._daily_pnl,
+                "daily_pnl_percent": round(daily_pnl_percent, 2),
+                "open_positions": await h._mt5(mt5.positions_total),
+                "leverage": account.leverage,
+                "currency": account.currency,
+                "timestamp": datetime.now().isoformat()
+            }
+            h._account_cache = (info, time.monotonic())
+            return info
+            
+        except Exception as e:
+            h.log(f"Error getting account info: {e}", level="error")
+            return {"error": str(e)}
+    
+    async def place_trade(
+        self,
+        symbol: str,
+        direction: TradeDirection,
+        stop_loss: float,
+        take_profit: float,
+        risk_percent: float,
+        account_balance: float | None,
+        symbol_info: Any
+    ) -> dict[str, Any]:
+        h = self._handler
+        
+        if not h._connected:
+            await h.connect()
+        
+        try:
+            # Obtém preço atual
+            tick = await h._get_symbol_tick(symbol)
+            if tick is None:
+                raise ValueError(f"Cannot get price for {symbol}")
+            
+            # Determina tipo de ordem e preço
+            if direction == "LONG":
+                order_type = mt5.ORDER_TYPE_BUY
+                price = tick.ask
+            else:
+                order_type = mt5.ORDER_TYPE_SELL
+                price = tick.bid
+            
+            # Calcula distância do SL em pips
+            sl_distance = abs(price - stop_loss)
+            if symbol_info is None:
+                symbol_info = await h._get_symbol_info(symbol)
+            point = symbol_info.point if symbol_info else 0.0001
+            sl_pips = sl_distance / (point * 10)  # Converte para pips
+            
+            # Obtém saldo e calcula lote
+            if account_balance is None:
+                account_balance = (await h._mt5(mt5.account_info)).balance
+            lot_size = await h._calculate_lot_size(
+                symbol=symbol,
+                stop_loss_pips=sl_pips,
+                risk_percent=risk_percent,
+                account_balance=account_balance,
+                symbol_info=symbol_info
+            )
+            
+            # Prepara requisição
+            request = {
+                "action": mt5.TRADE_ACTION_DEAL,
+                "symbol": symbol,
+                "volume": lot_size,
+                "type": order_type,
+                "price": price,
+                "sl": stop_loss,
+                "tp": take_profit,
+                "deviation": 20,
+                "magic": 3333,  # Magic number do 3V Engine
+                "comment": "3V Engine Auto",
+                "type_time": mt5.ORDER_TIME_GTC,
+                "type_filling": mt5.ORDER_FILLING_IOC,
+            }
+            
+            # Envia ordem (thread do MT5, uma chamada ao terminal por vez)
+            result = await h._mt5(mt5.order_send, request)
+            
+            if result.retcode != mt5.TRADE_RETCODE_DONE:
+                error_msg = f"Order failed: {result.retcode} - {result.comment}"
+                await h._log_error_to_supabase("ORDER_FAILED", error_msg)
+                return {"success": False, "error": error_msg}
+            
+            trade_result = {
+                "success": True,
+                "mode": "LIVE",
+                "ticket": result.order,
+                "symbol": symbol,
+                "direction": direction,
+                "volume": lot_size,
+                "price": result.price,
+                "stop_loss": stop_loss,
+                "take_profit": take_profit,
+                "timestamp": datetime.now().isoformat()
+            }
+            
+            h._open_orders.add(result.order)
+            h._account_cache = None
+            await h._log_trade_to_supabase(trade_result)
+            
+            h.log("Order placed successfully", trade_result, level="warning")
+            return trade_result
+            
+        except Exception as e:
+            error_msg = str(e)
+            h.log(f"Trade error: {error_msg}", level="error")
+            await h._log_error_to_supabase("TRADE_ERROR", error_msg)
+            return {"success": False, "error": error_msg}
+    
+    async def close_trade(self, ticket: int) -> dict[str, Any]:
+        h = self._handler
+        
+        if not h._connected:
+            await h.connect()
+        
+        try:
+            # Obtém posição
+            position = await h._mt5(mt5.positions_get, ticket=ticket)
+            if not position:
+                return {"success": False, "error": f"Position {ticket} not found"}
+            
+            position = position[0]
+            
+            # Determina tipo de fechamento (inverso)
+            close_type = mt5.ORDER_TYPE_SELL if position.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY
+            
+            tick = await h._get_symbol_tick(position.symbol)
+            price = tick.bid if close_type == mt5.ORDER_TYPE_SELL else tick.ask
+            
+            request = {
+                "action": mt5.TRADE_ACTION_DEAL,
+                "symbol": position.symbol,
+                "volume": position.volume,
+                "type": close_type,
+                "position": ticket,
+                "price": price,
+                "deviation": 20,
+                "magic": 3333,
+                "comment": "3V Engine Close",
+                "type_time": mt5.ORDER_TIME_GTC,
+                "type_filling": mt5.ORDER_FILLING_IOC,
+            }
+            
+            result = await h._mt5(mt5.order_send, request)
+            
+            if result.retcode != mt5.TRADE_RETCODE_DONE:
+                return {"success": False, "error": f"Close failed: {result.comment}"}
+            
+            # Atualiza P&L diário
+            profit = position.profit
+            h._update_daily_pnl(profit)
+            
+            h._open_orders.discard(ticket)
+            
+            return {
+                "success": True,
+                "mode": "LIVE",
+                "ticket": ticket,
+                "profit": profit,
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            h.log(f"Close error: {e}", level="error")
+            return {"success": False, "error": str(e)}
+    
+    async def update_trailing_stop(self, ticket: int, trailing_pips: float) -> dict[str, Any]:
+        h = self._handler
+        
+        if not h._connected:
+            await h.connect()
+        
+        try:
+            position = await h._mt5(mt5.positions_get, ticket=ticket)
+            if not position:
+                return {"success": False, "error": "Position not found"}
+            
+            position = position[0]
+            symbol_info = await h._get_symbol_info(position.symbol)
+            point = symbol_info.point
+            
+            tick = await h._get_symbol_tick(position.symbol)
+            
+            # Calcula novo SL baseado na direção
+            if position.type == mt5.ORDER_TYPE_BUY:
+                new_sl = tick.bid - (trailing_pips * point * 10)
+                # Só move se novo SL for maior que atual
+                if new_sl <= position.sl:
+                    return {"success": True, "message": "No update needed"}
+            else:
+                new_sl = tick.ask + (trailing_pips * point * 10)
+                if new_sl >= position.sl:
+                    return {"success": True, "message": "No update needed"}
+            
+            request = {
+                "action": mt5.TRADE_ACTION_SLTP,
+                "symbol": position.symbol,
+                "position": ticket,
+                "sl": new_sl,
+                "tp": position.tp,
+            }
+            
+            result = await h._mt5(mt5.order_send, request)
+            
+            if result.retcode != mt5.TRADE_RETCODE_DONE:
+                return {"success": False, "error": f"Modify failed: {result.comment}"}
+            
+            h.log(f"Trailing stop updated for #{ticket}", {"new_sl": new_sl})
+            return {"success": True, "new_sl": new_sl}
+            
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+
+class _SimulatedExecutor:
+    """Modo simulação: nada é enviado ao MT5, respostas montadas dos templates."""
+    
+    __slots__ = ("_handler",)
+    
+    def __init__(self, handler: "ExecutionHandlerAgent") -> None:
+        self._handler = handler
+    
+    async def get_account_info(self) -> dict[str, Any]:
+        return dict(
+            _SIM_ACCOUNT_TMPL,
+            daily_pnl=self._handler._daily_pnl,
+            timestamp=datetime.now().isoformat()
+        )
+    
+    async def place_trade(
+        self,
+        symbol: str,
+        direction: TradeDirection,
+        stop_loss: float,
+        take_profit: float,
+        risk_percent: float,
+        account_balance: float | None,
+        symbol_info: Any
+    ) -> dict[str, Any]:
+        h = self._handler
+        simulated_ticket = next(h._sim_ticket_seq)
+        result = dict(
+            _SIM_ORDER_TMPL,
+            ticket=simulated_ticket,
+            symbol=symbol,
+            direction=direction,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            timestamp=datetime.now().isoformat()
+        )
+        
+        h._open_orders.add(simulated_ticket)
+        await h._log_trade_to_supabase(result)
+        
+        h.log("SIMULATED order placed", result)
+        return result
+    
+    async def close_trade(self, ticket: int) -> dict[str, Any]:
+        self._handler._open_orders.discard(ticket)
+        return dict(_SIM_CLOSE_TMPL, ticket=ticket, timestamp=datetime.now().isoformat())
+    
+    async def update_trailing_stop(self, ticket: int, trailing_pips: float) -> dict[str, Any]:
+        return dict(_SIM_TRAILING_TMPL)
+
 
 class ExecutionHandlerAgent(BaseAgent):
     """
@@ -46,8 +408,31 @@ class ExecutionHandlerAgent(BaseAgent):
     - Log de todas as operações no Supabase
     """
     
-    MAX_RETRIES = 3
-    RETRY_DELAY = 5.0
+    # Atributos lidos a cada ordem/ciclo do monitor: slots em vez de __dict__
+    __slots__ = (
+        "_connected",
+        "_simulation_mode",
+        "_daily_pnl",
+        "_daily_pnl_date",
+        "_open_orders",
+        "_sb_semaphore",
+        "_mt5_lock",
+        "_keepalive_task",
+        "_symbol_info_cache",
+        "_symbol_tick_cache",
+        "_account_cache",
+        "_sim_ticket_seq",
+        "_impl",
+    )
+    
+    MAX_RETRIES = 6
+    RETRY_BASE = 0.5   # segundos (primeira espera)
+    RETRY_CAP = 30.0   # segundos (teto do backoff)
+    SUPABASE_CONCURRENCY = 8  # Chamadas Supabase simultâneas (threads)
+    KEEPALIVE_INTERVAL = 15.0  # segundos entre checagens do terminal MT5
+    SYMBOL_INFO_TTL = 60.0  # symbol_info é quase estático na sessão
+    SYMBOL_TICK_TTL = 0.2   # symbol_info_tick: preço muda rápido
+    ACCOUNT_TTL = 2.0       # get_account_info (check_daily_loss_limit a cada tick)
     
     def __init__(self) -> None:
         super().__init__()
@@ -55,7 +440,19 @@ class ExecutionHandlerAgent(BaseAgent):
         self._simulation_mode = not MT5_AVAILABLE
         self._daily_pnl = 0.0
         self._daily_pnl_date = date.today()
-        self._open_orders: list[int] = []  # Lista de tickets
+        self._open_orders: set[int] = set()  # Tickets abertos
+        self._sb_semaphore = asyncio.Semaphore(self.SUPABASE_CONCURRENCY)
+        # Uma chamada mt5.* por vez (ver _mt5)
+        self._mt5_lock = asyncio.Lock()
+        self._keepalive_task: asyncio.Task | None = None
+        # Cache de consultas MT5 por símbolo: symbol -> (valor, time.monotonic())
+        self._symbol_info_cache: dict[str, tuple[Any, float]] = {}
+        self._symbol_tick_cache: dict[str, tuple[Any, float]] = {}
+        self._account_cache: tuple[dict[str, Any], float] | None = None
+        # Tickets simulados únicos (timestamp inicial + sequência)
+        self._sim_ticket_seq = itertools.count(int(time.time()))
+        # Estratégia de execução escolhida uma vez (sem if simulação/live por chamada)
+        self._impl = _SimulatedExecutor(self) if self._simulation_mode else _LiveExecutor(self)
     
     @property
     def name(self) -> str:
@@ -92,15 +489,16 @@ Você é responsável por:
         
         for attempt in range(self.MAX_RETRIES):
             try:
-                if not mt5.initialize():
-                    raise ConnectionError(f"MT5 initialize failed: {mt5.last_error()}")
+                account_info = await self._mt5(_mt5_initialize)
                 
                 # Verifica se está conectado a uma conta
-                account_info = mt5.account_info()
                 if account_info is None:
                     raise ConnectionError("No account connected to MT5")
                 
                 self._connected = True
+                # Nova sessão: descarta consultas da sessão anterior
+                self._symbol_info_cache.clear()
+                self._symbol_tick_cache.clear()
                 self.log("Connected to MT5", {
                     "account": account_info.login,
                     "broker": account_info.company,
@@ -114,7 +512,7 @@ Você é responsável por:
                         level="warning")
                 
                 if attempt < self.MAX_RETRIES - 1:
-                    await asyncio.sleep(self.RETRY_DELAY)
+                    await self._backoff_sleep(attempt)
                 else:
                     self._connected = False
                     await self._log_error_to_supabase("CONNECTION_FAILED", str(e))
@@ -122,10 +520,100 @@ Você é responsável por:
         
         return False
     
-    def disconnect(self) -> None:
-        """Desconecta do MT5."""
+    async def _backoff_sleep(self, attempt: int) -> None:
+        """Espera com backoff exponencial + jitter antes da próxima tentativa."""
+        delay = min(self.RETRY_CAP, self.RETRY_BASE * (2 ** attempt))
+        await asyncio.sleep(delay * (0.5 + random.random() * 0.5))
+    
+    async def _sb(self, fn: Callable[[], Any]) -> Any:
+        """
+        Executa uma chamada síncrona do supabase-py numa thread.
+        
+        Evita bloquear o event loop durante o HTTPS; o semáforo limita
+        as conexões simultâneas ao Supabase.
+        """
+        async with self._sb_semaphore:
+            return await asyncio.to_thread(fn)
+    
+    async def _mt5(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Executa uma chamada mt5.* numa thread, uma de cada vez.
+        
+        A API MetaTrader5 fala com um único terminal por um canal IPC e não é
+        thread-safe: ordens em paralelo (place_trades), consultas e o
+        keep-alive passam todos por este lock.
+        """
+        async with self._mt5_lock:
+            call = asyncio.ensure_future(asyncio.to_thread(fn, *args, **kwargs))
+            try:
+                return await asyncio.shield(call)
+            except asyncio.CancelledError:
+                # Cancelar não para a thread: o lock só é liberado quando a
+                # chamada ao terminal terminar de fato
+                with contextlib.suppress(Exception):
+                    await call
+                raise
+    
+    async def _get_symbol_info(self, symbol: str) -> Any:
+        """mt5.symbol_info com cache de SYMBOL_INFO_TTL segundos."""
+        cached = self._symbol_info_cache.get(symbol)
+        now = time.monotonic()
+        if cached is not None and now - cached[1] < self.SYMBOL_INFO_TTL:
+            return cached[0]
+        info = await self._mt5(mt5.symbol_info, symbol)
+        if info is not None:
+            self._symbol_info_cache[symbol] = (info, now)
+        return info
+    
+    async def _get_symbol_tick(self, symbol: str) -> Any:
+        """mt5.symbol_info_tick com cache de SYMBOL_TICK_TTL segundos."""
+        cached = self._symbol_tick_cache.get(symbol)
+        now = time.monotonic()
+        if cached is not None and now - cached[1] < self.SYMBOL_TICK_TTL:
+            return cached[0]
+        tick = await self._mt5(mt5.symbol_info_tick, symbol)
+        if tick is not None:
+            self._symbol_tick_cache[symbol] = (tick, now)
+        return tick
+    
+    def start_keepalive(self) -> None:
+        """
+        Inicia a checagem periódica do terminal MT5 em background.
+        
+        A conexão IPC fica aberta entre ordens; só reinicializa (connect)
+        quando terminal_info() indica falha real.
+        """
+        if self._simulation_mode or self._keepalive_task is not None:
+            return
+        self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+    
+    async def _keepalive_loop(self) -> None:
+        """Loop de keep-alive: checa o terminal a cada KEEPALIVE_INTERVAL."""
+        while True:
+            await asyncio.sleep(self.KEEPALIVE_INTERVAL)
+            try:
+                terminal = await self._mt5(mt5.terminal_info)
+                if terminal is None or not terminal.connected:
+                    self.log("MT5 terminal disconnected, reconnecting", level="warning")
+                    self._connected = False
+                    await self.connect()
+            except Exception as e:
+                self.log(f"Keep-alive check failed: {e}", level="warning")
+    
+    async def disconnect(self) -> None:
+        """
+        Desconecta do MT5.
+        
+        Espera o keep-alive encerrar e envia shutdown pelo _mt5, depois de
+        qualquer chamada ao terminal ainda em andamento.
+        """
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._keepalive_task
+            self._keepalive_task = None
         if MT5_AVAILABLE and not self._simulation_mode:
-            mt5.shutdown()
+            await self._mt5(mt5.shutdown)
         self._connected = False
         self.log("Disconnected from MT5")
     
@@ -135,60 +623,23 @@ Você é responsável por:
         """
         Obtém informações da conta em tempo real.
         
+        Em modo LIVE o resultado fica em cache por ACCOUNT_TTL segundos e é
+        invalidado quando uma ordem abre/fecha ou o P&L diário muda.
+        
         Returns:
             Dict com balance, equity, margin, free_margin, daily_pnl
         """
-        if self._simulation_mode:
-            return {
-                "mode": "SIMULATION",
-                "balance": 10000.0,
-                "equity": 10000.0,
-                "margin": 0.0,
-                "free_margin": 10000.0,
-                "daily_pnl": self._daily_pnl,
-                "daily_pnl_percent": 0.0,
-                "open_positions": 0,
-                "timestamp": datetime.now().isoformat()
-            }
-        
-        if not self._connected:
-            await self.connect()
-        
-        try:
-            account = mt5.account_info()
-            if account is None:
-                raise ValueError("Failed to get account info")
-            
-            # Calcula P&L diário
-            daily_pnl_percent = (self._daily_pnl / account.balance * 100) if account.balance > 0 else 0
-            
-            return {
-                "mode": "LIVE",
-                "balance": account.balance,
-                "equity": account.equity,
-                "margin": account.margin,
-                "free_margin": account.margin_free,
-                "profit": account.profit,
-                "daily_pnl": self._daily_pnl,
-                "daily_pnl_percent": round(daily_pnl_percent, 2),
-                "open_positions": mt5.positions_total(),
-                "leverage": account.leverage,
-                "currency": account.currency,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            self.log(f"Error getting account info: {e}", level="error")
-            return {"error": str(e)}
+        return await self._impl.get_account_info()
     
     # ============== TRADING ==============
     
-    def _calculate_lot_size(
+    async def _calculate_lot_size(
         self,
         symbol: str,
         stop_loss_pips: float,
         risk_percent: float,
-        account_balance: float
+        account_balance: float,
+        symbol_info: Any = None
     ) -> float:
         """
         Calcula tamanho do lote baseado em risco percentual.
@@ -200,6 +651,7 @@ Você é responsável por:
             stop_loss_pips: Distância do SL em pips
             risk_percent: Percentual de risco (1.0 = 1%)
             account_balance: Saldo da conta
+            symbol_info: mt5.symbol_info já obtido pelo chamador (opcional)
         
         Returns:
             Tamanho do lote (arredondado para 2 decimais)
@@ -209,7 +661,8 @@ Você é responsável por:
             return 0.01
         
         try:
-            symbol_info = mt5.symbol_info(symbol)
+            if symbol_info is None:
+                symbol_info = await self._get_symbol_info(symbol)
             if symbol_info is None:
                 self.log(f"Symbol {symbol} not found", level="error")
                 return 0.01  # Lote mínimo
@@ -245,7 +698,9 @@ Você é responsável por:
         direction: TradeDirection,
         stop_loss: float,
         take_profit: float,
-        risk_percent: float = 1.0
+        risk_percent: float = 1.0,
+        account_balance: float | None = None,
+        symbol_info: Any = None
     ) -> dict[str, Any]:
         """
         Abre uma ordem no MT5.
@@ -256,6 +711,8 @@ Você é responsável por:
             stop_loss: Preço do Stop Loss
             take_profit: Preço do Take Profit
             risk_percent: Percentual de risco por trade
+            account_balance: Saldo já obtido pelo chamador (opcional, evita account_info)
+            symbol_info: mt5.symbol_info já obtido pelo chamador (opcional)
         
         Returns:
             Dict com resultado da ordem (ticket, price, etc)
@@ -267,108 +724,50 @@ Você é responsável por:
             "risk": f"{risk_percent}%"
         })
         
-        if self._simulation_mode:
-            # Modo simulação
-            simulated_ticket = int(datetime.now().timestamp())
-            result = {
-                "success": True,
-                "mode": "SIMULATION",
-                "ticket": simulated_ticket,
-                "symbol": symbol,
-                "direction": direction,
-                "volume": 0.01,
-                "price": 1.08500,  # Preço simulado
-                "stop_loss": stop_loss,
-                "take_profit": take_profit,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            self._open_orders.append(simulated_ticket)
-            await self._log_trade_to_supabase(result)
-            
-            self.log("SIMULATED order placed", result)
-            return result
+        return await self._impl.place_trade(
+            symbol, direction, stop_loss, take_profit,
+            risk_percent, account_balance, symbol_info
+        )
+    
+    async def place_trades(self, orders: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Abre várias ordens em paralelo (ex: multi-par).
+        
+        Saldo e symbol_info são consultados uma vez (por símbolo distinto) e
+        as ordens são preparadas juntas; o envio ao terminal segue em fila
+        (_mt5), uma ordem por vez, sem espera entre elas.
+        
+        Args:
+            orders: Lista de dicts com os argumentos de place_trade
+                (symbol, direction, stop_loss, take_profit, risk_percent)
+        
+        Returns:
+            Resultados na mesma ordem de orders
+        """
+        if self._simulation_mode or len(orders) <= 1:
+            return list(await asyncio.gather(*(self.place_trade(**order) for order in orders)))
         
         if not self._connected:
             await self.connect()
         
         try:
-            # Obtém preço atual
-            tick = mt5.symbol_info_tick(symbol)
-            if tick is None:
-                raise ValueError(f"Cannot get price for {symbol}")
-            
-            # Determina tipo de ordem e preço
-            if direction == "LONG":
-                order_type = mt5.ORDER_TYPE_BUY
-                price = tick.ask
-            else:
-                order_type = mt5.ORDER_TYPE_SELL
-                price = tick.bid
-            
-            # Calcula distância do SL em pips
-            sl_distance = abs(price - stop_loss)
-            symbol_info = mt5.symbol_info(symbol)
-            point = symbol_info.point if symbol_info else 0.0001
-            sl_pips = sl_distance / (point * 10)  # Converte para pips
-            
-            # Obtém saldo e calcula lote
-            account = mt5.account_info()
-            lot_size = self._calculate_lot_size(
-                symbol=symbol,
-                stop_loss_pips=sl_pips,
-                risk_percent=risk_percent,
-                account_balance=account.balance
-            )
-            
-            # Prepara requisição
-            request = {
-                "action": mt5.TRADE_ACTION_DEAL,
-                "symbol": symbol,
-                "volume": lot_size,
-                "type": order_type,
-                "price": price,
-                "sl": stop_loss,
-                "tp": take_profit,
-                "deviation": 20,
-                "magic": 3333,  # Magic number do 3V Engine
-                "comment": "3V Engine Auto",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
+            account_balance = (await self._mt5(mt5.account_info)).balance
+            symbol_infos = {
+                symbol: await self._get_symbol_info(symbol)
+                for symbol in {order["symbol"] for order in orders}
             }
-            
-            # Envia ordem
-            result = mt5.order_send(request)
-            
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
-                error_msg = f"Order failed: {result.retcode} - {result.comment}"
-                await self._log_error_to_supabase("ORDER_FAILED", error_msg)
-                return {"success": False, "error": error_msg}
-            
-            trade_result = {
-                "success": True,
-                "mode": "LIVE",
-                "ticket": result.order,
-                "symbol": symbol,
-                "direction": direction,
-                "volume": lot_size,
-                "price": result.price,
-                "stop_loss": stop_loss,
-                "take_profit": take_profit,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            self._open_orders.append(result.order)
-            await self._log_trade_to_supabase(trade_result)
-            
-            self.log("Order placed successfully", trade_result, level="warning")
-            return trade_result
-            
         except Exception as e:
-            error_msg = str(e)
-            self.log(f"Trade error: {error_msg}", level="error")
-            await self._log_error_to_supabase("TRADE_ERROR", error_msg)
-            return {"success": False, "error": error_msg}
+            self.log(f"Batch trade setup error: {e}", level="error")
+            return [{"success": False, "error": str(e)} for _ in orders]
+        
+        return list(await asyncio.gather(*(
+            self.place_trade(
+                **order,
+                account_balance=account_balance,
+                symbol_info=symbol_infos[order["symbol"]]
+            )
+            for order in orders
+        )))
     
     async def close_trade(self, ticket: int) -> dict[str, Any]:
         """
@@ -382,71 +781,7 @@ Você é responsável por:
         """
         self.log(f"Closing trade #{ticket}")
         
-        if self._simulation_mode:
-            if ticket in self._open_orders:
-                self._open_orders.remove(ticket)
-            return {
-                "success": True,
-                "mode": "SIMULATION",
-                "ticket": ticket,
-                "message": "Simulated close",
-                "timestamp": datetime.now().isoformat()
-            }
-        
-        if not self._connected:
-            await self.connect()
-        
-        try:
-            # Obtém posição
-            position = mt5.positions_get(ticket=ticket)
-            if not position:
-                return {"success": False, "error": f"Position {ticket} not found"}
-            
-            position = position[0]
-            
-            # Determina tipo de fechamento (inverso)
-            close_type = mt5.ORDER_TYPE_SELL if position.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY
-            
-            tick = mt5.symbol_info_tick(position.symbol)
-            price = tick.bid if close_type == mt5.ORDER_TYPE_SELL else tick.ask
-            
-            request = {
-                "action": mt5.TRADE_ACTION_DEAL,
-                "symbol": position.symbol,
-                "volume": position.volume,
-                "type": close_type,
-                "position": ticket,
-                "price": price,
-                "deviation": 20,
-                "magic": 3333,
-                "comment": "3V Engine Close",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
-            }
-            
-            result = mt5.order_send(request)
-            
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
-                return {"success": False, "error": f"Close failed: {result.comment}"}
-            
-            # Atualiza P&L diário
-            profit = position.profit
-            self._update_daily_pnl(profit)
-            
-            if ticket in self._open_orders:
-                self._open_orders.remove(ticket)
-            
-            return {
-                "success": True,
-                "mode": "LIVE",
-                "ticket": ticket,
-                "profit": profit,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            self.log(f"Close error: {e}", level="error")
-            return {"success": False, "error": str(e)}
+        return await self._impl.close_trade(ticket)
     
     async def update_trailing_stop(
         self,
@@ -463,52 +798,7 @@ Você é responsável por:
         Returns:
             Dict com resultado da modificação
         """
-        if self._simulation_mode:
-            return {"success": True, "mode": "SIMULATION", "message": "Trailing stop updated"}
-        
-        if not self._connected:
-            await self.connect()
-        
-        try:
-            position = mt5.positions_get(ticket=ticket)
-            if not position:
-                return {"success": False, "error": "Position not found"}
-            
-            position = position[0]
-            symbol_info = mt5.symbol_info(position.symbol)
-            point = symbol_info.point
-            
-            tick = mt5.symbol_info_tick(position.symbol)
-            
-            # Calcula novo SL baseado na direção
-            if position.type == mt5.ORDER_TYPE_BUY:
-                new_sl = tick.bid - (trailing_pips * point * 10)
-                # Só move se novo SL for maior que atual
-                if new_sl <= position.sl:
-                    return {"success": True, "message": "No update needed"}
-            else:
-                new_sl = tick.ask + (trailing_pips * point * 10)
-                if new_sl >= position.sl:
-                    return {"success": True, "message": "No update needed"}
-            
-            request = {
-                "action": mt5.TRADE_ACTION_SLTP,
-                "symbol": position.symbol,
-                "position": ticket,
-                "sl": new_sl,
-                "tp": position.tp,
-            }
-            
-            result = mt5.order_send(request)
-            
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
-                return {"success": False, "error": f"Modify failed: {result.comment}"}
-            
-            self.log(f"Trailing stop updated for #{ticket}", {"new_sl": new_sl})
-            return {"success": True, "new_sl": new_sl}
-            
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return await self._impl.update_trailing_stop(ticket, trailing_pips)
     
     # ============== TRADE MONITORING ==============
     
@@ -517,6 +807,7 @@ Você é responsável por:
         Obtém preço atual do par.
         
         Tenta via TwelveData, se falhar simula flutuação para mercado fechado.
+        Nunca levanta exceção.
         
         Args:
             symbol: Símbolo do par (ex: EURUSD)
@@ -524,12 +815,10 @@ Você é responsável por:
         Returns:
             Preço atual (ou simulado)
         """
-        import random
-        from utils.twelve_data import twelve_data_client
-        
         try:
-            # Tenta obter preço real
-            price_data = await twelve_data_client.get_current_price()
+            # Tenta obter preço real (Twelve Data usa o par com barra)
+            pair = symbol if "/" in symbol else f"{symbol[:3]}/{symbol[3:]}"
+            price_data = await twelve_data_client.get_current_price(pair)
             return price_data.get("price", 1.0850)
         except Exception as e:
             self.log(f"Failed to get real price, using simulation: {e}", level="warning")
@@ -537,48 +826,55 @@ Você é responsável por:
             base_price = 1.0850  # Preço base para simulação
             return base_price * (1 + random.uniform(-0.0005, 0.0005))
     
-    async def _close_trade_with_notification(
+    def _build_close_update(
         self,
         trade: dict[str, Any],
         reason: str,
         current_price: float,
-        profit: float
+        profit: float,
+        now: datetime
+    ) -> dict[str, Any]:
+        """Monta a atualização de fechamento (status CLOSED) para apply_trade_updates."""
+        return {
+            "ticket": trade.get("ticket"),
+            "status": "CLOSED",
+            "profit": round(profit, 2),
+            "patch": {
+                "exit_price": current_price,
+                "closed_at": now.isoformat(),
+                "close_reason": reason
+            }
+        }
+    
+    async def _notify_trade_closed(
+        self,
+        trade: dict[str, Any],
+        reason: str,
+        current_price: float,
+        profit: float,
+        now: datetime
     ) -> bool:
         """
-        Fecha trade no Supabase e envia notificação Telegram.
+        Pós-fechamento (já gravado no Supabase): estado local e notificação Telegram.
         
         Args:
             trade: Dados do trade do Supabase
             reason: "TAKE_PROFIT" ou "STOP_LOSS"
             current_price: Preço de saída
             profit: Lucro/prejuízo final
+            now: Horário do fechamento
         
         Returns:
-            True se fechado com sucesso
+            True se notificado com sucesso
         """
-        from utils.telegram_bot import telegram_bot
-        
         try:
             ticket = trade.get("ticket")
             symbol = trade.get("symbol", "EURUSD")
             entry_price = trade.get("entry_price", 0)
             direction = trade.get("direction", "LONG")
             
-            # Atualiza status no Supabase (apenas colunas existentes)
-            supabase_client.client.table("execution_log").update({
-                "status": "CLOSED",
-                "profit": round(profit, 2),
-                "data": {
-                    **trade.get("data", {}),
-                    "exit_price": current_price,
-                    "closed_at": datetime.now().isoformat(),
-                    "close_reason": reason
-                }
-            }).eq("ticket", ticket).execute()
-            
-            # Remove da lista de ordens abertas
-            if ticket in self._open_orders:
-                self._open_orders.remove(ticket)
+            # Remove dos tickets abertos
+            self._open_orders.discard(ticket)
             
             # Atualiza P&L diário
             self._update_daily_pnl(profit)
@@ -593,25 +889,20 @@ Você é responsável por:
                 header = "STOP LOSS ATINGIDO"
                 color_emoji = "🔴" if profit < 0 else "🟢"
             
-            message = f"""
-{emoji} <b>3V ENGINE - {header}</b>
-━━━━━━━━━━━━━━━━━
-
-📊 <b>Par:</b> {symbol}
-📈 <b>Direção:</b> {direction}
-
-💵 <b>Entrada:</b> {entry_price:.5f}
-🎯 <b>Saída:</b> {current_price:.5f}
-
-{color_emoji} <b>Resultado:</b> ${profit:.2f}
-🎫 <b>Ticket:</b> #{ticket}
-
-🕐 {datetime.now().strftime("%H:%M:%S")} (GMT-3)
-━━━━━━━━━━━━━━━━━
-<code>3V Engine • Trade Fechado</code>
-"""
+            message = _CLOSE_MSG_TMPL.format(
+                emoji=emoji,
+                header=header,
+                symbol=symbol,
+                direction=direction,
+                entry=entry_price,
+                exit=current_price,
+                color=color_emoji,
+                profit=profit,
+                ticket=ticket,
+                time=now.strftime("%H:%M:%S")
+            )
             
-            await telegram_bot._send_message(message.strip())
+            await telegram_bot._send_message(message)
             
             self.log(f"Trade #{ticket} closed: {reason}, profit: ${profit:.2f}")
             return True
@@ -625,22 +916,24 @@ Você é responsável por:
         Monitora trades abertos, atualiza P&L e verifica TP/SL.
         
         Para cada trade OPEN:
-        1. Obtém preço atual (real ou simulado)
+        1. Obtém preço atual (real ou simulado, uma busca por símbolo)
         2. Calcula P&L
-        3. Atualiza profit no Supabase
-        4. Verifica se TP/SL foi atingido
-        5. Se atingido, fecha trade e notifica
+        3. Verifica se TP/SL foi atingido
+        4. Grava profit e fechamentos numa única RPC apply_trade_updates
+        5. Notifica os trades fechados
         
         Returns:
             Dict com resumo do monitoramento
         """
         try:
             # Busca trades abertos
-            result = supabase_client.client.table("execution_log") \
-                .select("*") \
-                .eq("status", "OPEN") \
-                .eq("type", "TRADE") \
-                .execute()
+            result = await self._sb(
+                supabase_client.client.table("execution_log")
+                .select("*")
+                .eq("status", "OPEN")
+                .eq("type", "TRADE")
+                .execute
+            )
             
             open_trades = result.data or []
             
@@ -649,92 +942,98 @@ Você é responsável por:
             
             self.log(f"Monitoring {len(open_trades)} open trade(s)")
             
-            trades_updated = 0
-            trades_closed = 0
+            pending_updates: list[dict[str, Any]] = []  # Gravados numa única RPC
+            now = datetime.now()  # Um timestamp por ciclo
+            now_iso = now.isoformat()
+            
+            # Um preço por símbolo distinto, buscados em paralelo
+            # (_get_current_price não levanta: sem preço real, cai na simulação)
+            symbols = list({trade.get("symbol", "EURUSD") for trade in open_trades})
+            prices = dict(zip(
+                symbols,
+                await asyncio.gather(*(self._get_current_price(symbol) for symbol in symbols))
+            ))
             
+            # Colunas numéricas validadas por trade: linha inválida (legado,
+            # texto) é logada e pulada, sem derrubar o ciclo dos demais
+            trades: list[dict[str, Any]] = []
+            rows: list[tuple[float, float, float, float]] = []
             for trade in open_trades:
                 try:
-                    symbol = trade.get("symbol", "EURUSD")
-                    ticket = trade.get("ticket")
-                    entry_price = float(trade.get("entry_price", 0))
-                    stop_loss = float(trade.get("stop_loss", 0))
-                    take_profit = float(trade.get("take_profit", 0))
-                    direction = trade.get("direction", "LONG")
-                    volume = float(trade.get("volume", 0.01))
-                    mode = trade.get("mode", "SIMULATION")
-                    
-                    # Obtém preço atual
-                    current_price = await self._get_current_price(symbol)
-                    
-                    # Calcula P&L
-                    if direction == "LONG":
-                        pnl = (current_price - entry_price) * volume * 100000
-                    else:  # SHORT
-                        pnl = (entry_price - current_price) * volume * 100000
-                    
-                    pnl = round(pnl, 2)
-                    
-                    # Verifica TP/SL
-                    tp_hit = False
-                    sl_hit = False
-                    
-                    if direction == "LONG":
-                        if take_profit > 0 and current_price >= take_profit:
-                            tp_hit = True
-                        if stop_loss > 0 and current_price <= stop_loss:
-                            sl_hit = True
-                    else:  # SHORT
-                        if take_profit > 0 and current_price <= take_profit:
-                            tp_hit = True
-                        if stop_loss > 0 and current_price >= stop_loss:
-                            sl_hit = True
-                    
-                    if tp_hit:
-                        # Recalcula P&L final com preço exato do TP
-                        if direction == "LONG":
-                            final_pnl = (take_profit - entry_price) * volume * 100000
-                        else:
-                            final_pnl = (entry_price - take_profit) * volume * 100000
-                        
-                        await self._close_trade_with_notification(
-                            trade=trade,
-                            reason="TAKE_PROFIT",
-                            current_price=take_profit,
-                            profit=round(final_pnl, 2)
-                        )
-                        trades_closed += 1
-                        
-                    elif sl_hit:
-                        # Recalcula P&L final com preço exato do SL
-                        if direction == "LONG":
-                            final_pnl = (stop_loss - entry_price) * volume * 100000
-                        else:
-                            final_pnl = (entry_price - stop_loss) * volume * 100000
-                        
-                        await self._close_trade_with_notification(
-                            trade=trade,
-                            reason="STOP_LOSS",
-                            current_price=stop_loss,
-                            profit=round(final_pnl, 2)
-                        )
-                        trades_closed += 1
-                        
-                    else:
-                        # Apenas atualiza profit no Supabase (apenas colunas existentes)
-                        supabase_client.client.table("execution_log").update({
-                            "profit": pnl,
-                            "data": {
-                                **trade.get("data", {}),
-                                "current_price": current_price,
-                                "last_update": datetime.now().isoformat()
-                            }
-                        }).eq("ticket", ticket).execute()
-                        trades_updated += 1
-                        
-                        self.log(f"Trade #{ticket}: Price={current_price:.5f}, P&L=${pnl:.2f}")
-                    
-                except Exception as e:
+                    rows.append((
+                        float(trade.get("entry_price") or 0.0),
+                        float(trade.get("stop_loss") or 0.0),
+                        float(trade.get("take_profit") or 0.0),
+                        float(trade.get("volume") or 0.01)
+                    ))
+                except (TypeError, ValueError) as e:
                     self.log(f"Error monitoring trade {trade.get('ticket')}: {e}", level="error")
+                    continue
+                trades.append(trade)
+            
+            # P&L e TP/SL de todos os trades de uma vez (arrays por coluna)
+            entry, stop_loss, take_profit, volume = np.array(rows, dtype=np.float64).reshape(-1, 4).T
+            # side = +1 (LONG) / -1 (SHORT): as fórmulas de LONG e SHORT viram uma só
+            side = np.array(
+                [1.0 if trade.get("direction", "LONG") == "LONG" else -1.0 for trade in trades]
+            )
+            price = np.array([prices[trade.get("symbol", "EURUSD")] for trade in trades], dtype=np.float64)
+            
+            pnl = np.round(side * (price - entry) * volume * 100000, 2)
+            tp_hit = (take_profit > 0) & (side * (price - take_profit) >= 0)
+            sl_hit = (stop_loss > 0) & (side * (stop_loss - price) >= 0)
+            
+            # P&L final recalculado no preço exato do TP/SL (TP tem prioridade)
+            exit_price = np.where(tp_hit, take_profit, stop_loss)
+            final_pnl = np.round(side * (exit_price - entry) * volume * 100000, 2)
+            hit = tp_hit | sl_hit
+            
+            for i in np.flatnonzero(~hit).tolist():
+                trade = trades[i]
+                current_price = float(price[i])
+                trade_pnl = float(pnl[i])
+                
+                # Apenas atualiza profit e envia só as chaves novas de data
+                pending_updates.append({
+                    "ticket": trade.get("ticket"),
+                    "profit": trade_pnl,
+                    "patch": {
+                        "current_price": current_price,
+                        "last_update": now_iso
+                    }
+                })
+                
+                self.log(f"Trade #{trade.get('ticket')}: Price={current_price:.5f}, P&L=${trade_pnl:.2f}")
+            
+            # Fechamentos entram na mesma RPC das atualizações (uma ida ao banco por ciclo)
+            closed = [
+                (
+                    trades[i],
+                    "TAKE_PROFIT" if tp_hit[i] else "STOP_LOSS",
+                    float(exit_price[i]),
+                    float(final_pnl[i])
+                )
+                for i in np.flatnonzero(hit).tolist()
+            ]
+            pending_updates.extend(
+                self._build_close_update(trade, reason, exit_at, profit, now)
+                for trade, reason, exit_at, profit in closed
+            )
+            
+            if not await self._flush_trade_updates(pending_updates):
+                return {
+                    "trades_monitored": len(open_trades),
+                    "trades_updated": 0,
+                    "trades_closed": 0
+                }
+            
+            # Notificações Telegram dos fechamentos em paralelo
+            await asyncio.gather(*(
+                self._notify_trade_closed(trade, reason, exit_at, profit, now)
+                for trade, reason, exit_at, profit in closed
+            ))
+            trades_closed = len(closed)
+            trades_updated = len(pending_updates) - trades_closed
             
             return {
                 "trades_monitored": len(open_trades),
@@ -746,10 +1045,30 @@ Você é responsável por:
             self.log(f"Failed to monitor open trades: {e}", level="error")
             return {"error": str(e), "trades_monitored": 0}
     
+    async def _flush_trade_updates(self, updates: list[dict[str, Any]]) -> int:
+        """
+        Grava as atualizações de trades (profit e fechamentos) numa única RPC.
+        
+        Returns:
+            Número de trades atualizados (0 se falhar)
+        """
+        if not updates:
+            return 0
+        try:
+            await self._sb(
+                supabase_client.client.rpc("apply_trade_updates", {"updates": updates}).execute
+            )
+            return len(updates)
+        except Exception as e:
+            self.log(f"Failed to update trades: {e}", level="error")
+            return 0
+    
     # ============== SAFETY ==============
     
     def _update_daily_pnl(self, profit: float) -> None:
         """Atualiza P&L diário."""
+        self._account_cache = None
+        
         # Reset se mudou o dia
         if date.today() != self._daily_pnl_date:
             self._daily_pnl = 0.0
@@ -795,10 +1114,12 @@ Você é responsável por:
                 "ticket": trade_data.get("ticket"),
                 "symbol": trade_data.get("symbol"),
                 "direction": trade_data.get("direction"),
-                "volume": trade_data.get("volume", 0.01),
-                "entry_price": trade_data.get("price"),
-                "stop_loss": trade_data.get("stop_loss"),
-                "take_profit": trade_data.get("take_profit"),
+                # Numéricos gravados já como float (double precision): o
+                # monitor_open_trades lê direto, sem converter a cada ciclo
+                "volume": float(trade_data.get("volume") or 0.01),
+                "entry_price": float(trade_data.get("price") or 0.0),
+                "stop_loss": float(trade_data.get("stop_loss") or 0.0),
+                "take_profit": float(trade_data.get("take_profit") or 0.0),
                 "status": "OPEN",
                 "profit": 0.0,
                 "mode": trade_data.get("mode", "SIMULATION"),
@@ -806,21 +1127,23 @@ Você é responsável por:
                 "data": trade_data
             }
             
-            supabase_client.client.table("execution_log").insert(record).execute()
+            await self._sb(supabase_client.client.table("execution_log").insert(record).execute)
         except Exception as e:
             self.log(f"Failed to log trade to Supabase: {e}", level="warning")
     
     async def _log_error_to_supabase(self, error_type: str, message: str) -> None:
         """Loga erro crítico no Supabase com prioridade alta."""
         try:
-            supabase_client.client.table("execution_log").insert({
-                "type": "ERROR",
-                "priority": "HIGH",
-                "error_type": error_type,
-                "message": message,
-                "mode": "SYSTEM",
-                "status": "LOGGED"
-            }).execute()
+            await self._sb(
+                supabase_client.client.table("execution_log").insert({
+                    "type": "ERROR",
+                    "priority": "HIGH",
+                    "error_type": error_type,
+                    "message": message,
+                    "mode": "SYSTEM",
+                    "status": "LOGGED"
+                }).execute
+            )
         except Exception as e:
             self.log(f"Failed to log error to Supabase: {e}", level="error")
 
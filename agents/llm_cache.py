@@ -0,0 +1,71 @@
+"""
+3V Engine - LLM Response Cache
+===============================
+Cache exato de respostas do LLM: chave = hash do conteúdo do prompt.
+
+Uso (risk_commander, ...): monte a chave com AICache.key(system_prompt,
+user_message), consulte get() antes da chamada e faça put() só depois de
+validar a resposta. Mudanças no template do prompt mudam o texto e, com
+ele, a chave: não há versão a incrementar.
+
+Não há camada semântica (embeddings): exigiria um modelo local só para
+isso, e prompts "quase iguais" aqui carregam preços diferentes.
+"""
+
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+
+
+class AICache:
+    """
+    Cache LRU com TTL para respostas do LLM.
+    
+    get/put não têm await no meio, então são atômicos entre corrotinas
+    (dispensa asyncio.Lock).
+    """
+    
+    def __init__(self, ttl: float = 300.0, maxsize: int = 512) -> None:
+        """
+        Args:
+            ttl: Validade de cada resposta, em segundos
+            maxsize: Máximo de respostas guardadas (descarta a menos usada)
+        """
+        self._ttl = ttl
+        self._maxsize = maxsize
+        # chave -> (resposta, time.monotonic())
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+    
+    @staticmethod
+    def key(*parts: str) -> str:
+        """Chave estável para as partes do prompt (ordem importa)."""
+        digest = blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> str | None:
+        """Resposta em cache para key, ou None se ausente/expirada."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if time.monotonic() - entry[1] < self._ttl:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            del self._entries[key]
+        self._misses += 1
+        return None
+    
+    def put(self, key: str, value: str) -> None:
+        """Guarda a resposta (já validada) para key."""
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+    
+    def stats(self) -> dict[str, int]:
+        """Contadores de uso (hits, misses, size)."""
+        return {"hits": self._hits, "misses": self._misses, "size": len(self._entries)}
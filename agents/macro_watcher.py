@@ -5,30 +5,15 @@
 Verifica calendário econômico via Forex Factory RSS.
 """
 
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Final
 
 from agents.base import BaseAgent
 from utils.forex_factory import forex_factory_client
 
 
-class MacroWatcherAgent(BaseAgent):
-    """
-    @Macro_Watcher - Vigilante Macroeconômico
-    
-    Responsabilidades:
-    - Monitorar calendário econômico via Forex Factory RSS
-    - Identificar eventos de Alto Impacto (High)
-    - Emitir alertas de volatilidade iminente
-    - Considerar janela de 60 minutos para risco
-    """
-    
-    @property
-    def name(self) -> str:
-        return "@Macro_Watcher"
-    
-    @property
-    def role(self) -> str:
-        return """Vigilante Macroeconômico especializado em eventos de impacto no Forex.
+# Papel enviado ao LLM (prompt de sistema)
+_MACRO_ROLE: Final[str] = """Vigilante Macroeconômico especializado em eventos de impacto no Forex.
         
 Você monitora:
 1. Decisões de taxa de juros (Fed, BCE)
@@ -43,6 +28,38 @@ Alertas de volatilidade:
 - LOW_RISK: Calendário limpo
 
 Seu papel é PROTEGER contra volatilidade inesperada."""
+
+
+# Alertas que bloqueiam trade (should_trade=False)
+_HIGH_MACRO: Final = frozenset({"HIGH_RISK", "EXTREME_RISK"})
+
+
+# Análise sem eventos no horizonte: template imutável, copiado a cada rodada
+# (o resultado vai para o estado do LangGraph e para o Supabase)
+_NEUTRAL_CLEAR_CALENDAR: Final = MappingProxyType({
+    "signal": "NEUTRAL",
+    "confidence_score": 90,
+    "analysis": "No significant economic events in the next 60 minutes",
+    "key_factors": ("Clear economic calendar",)
+})
+
+
+class MacroWatcherAgent(BaseAgent):
+    """
+    @Macro_Watcher - Vigilante Macroeconômico
+    
+    Responsabilidades:
+    - Monitorar calendário econômico via Forex Factory RSS
+    - Identificar eventos de Alto Impacto (High)
+    - Emitir alertas de volatilidade iminente
+    - Considerar janela de 60 minutos para risco
+    """
+    
+    model_tier = "fast"
+    
+    # Constantes de classe (sem property): lidas a cada análise/log
+    name = "@Macro_Watcher"
+    role = _MACRO_ROLE
     
     async def analyze(self, market_state: dict[str, Any]) -> dict[str, Any]:
         """
@@ -61,43 +78,49 @@ Seu papel é PROTEGER contra volatilidade inesperada."""
             minutes_window=60
         )
         
-        self.log("Calendar check complete", {
-            "alert": calendar_data["alert"],
-            "high_impact": calendar_data["high_impact_events"],
-            "total_events": calendar_data["total_events"]
-        })
+        if self.log_enabled():
+            self.log("Calendar check complete", {
+                "alert": calendar_data["alert"],
+                "high_impact": calendar_data["high_impact_events"],
+                "total_events": calendar_data["total_events"]
+            })
         
         # Se houver eventos, usa LLM para análise de risco
         if calendar_data["total_events"] > 0:
-            llm_input = {
-                "alert_level": calendar_data["alert"],
-                "upcoming_events": calendar_data["events"],
-                "high_impact_count": calendar_data["high_impact_events"]
-            }
-            llm_analysis = await self.reason(llm_input)
+            llm_analysis = await self.reason(
+                alert_level=calendar_data["alert"],
+                upcoming_events=calendar_data["events"],
+                high_impact_count=calendar_data["high_impact_events"]
+            )
+            raw_data = calendar_data
         else:
-            llm_analysis = {
-                "signal": "NEUTRAL",
-                "confidence_score": 90,
-                "analysis": "No significant economic events in the next 60 minutes",
-                "key_factors": ["Clear economic calendar"]
+            # Calendário limpo (caso comum): resposta fixa e raw_data enxuto
+            llm_analysis = dict(
+                _NEUTRAL_CLEAR_CALENDAR,
+                key_factors=list(_NEUTRAL_CLEAR_CALENDAR["key_factors"])
+            )
+            raw_data = {
+                "alert": calendar_data["alert"],
+                "timestamp": calendar_data["timestamp"],
+                "total_events": 0
             }
         
         result = {
             "agent": self.name,
             "timestamp": calendar_data["timestamp"],
-            "raw_data": calendar_data,
+            "raw_data": raw_data,
             "llm_analysis": llm_analysis,
             "alert": calendar_data["alert"],
             "message": calendar_data["message"],
             "high_impact_events": calendar_data["high_impact_events"],
-            "should_trade": calendar_data["alert"] not in ["EXTREME_RISK", "HIGH_RISK"]
+            "should_trade": calendar_data["alert"] not in _HIGH_MACRO
         }
         
-        self.log("Analysis complete", {
-            "alert": result["alert"],
-            "should_trade": result["should_trade"]
-        })
+        if self.log_enabled():
+            self.log("Analysis complete", {
+                "alert": result["alert"],
+                "should_trade": result["should_trade"]
+            })
         
         return result
 
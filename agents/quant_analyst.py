@@ -6,12 +6,164 @@ Consome API Twelve Data e calcula indicadores.
 Agora inclui cálculo de TP/SL baseado em Bollinger Bands e RSI.
 """
 
-from typing import Any
+import asyncio
+from enum import IntEnum, IntFlag
+from operator import itemgetter
+from typing import Any, Final
 
+from agents._quant_kernels import (
+    REASON_BB,
+    REASON_RSI_CONFIRM,
+    REASON_RSI_HIGH,
+    REASON_RSI_LOW,
+    REASON_RSI_MOMENTUM,
+    REASON_RSI_OVERBOUGHT,
+    REASON_RSI_OVERSOLD,
+    REASON_TREND,
+    score_kernel,
+)
 from agents.base import BaseAgent
 from utils.twelve_data import twelve_data_client
 
 
+class Signal(IntEnum):
+    """Sinal técnico; convertido para string (.name) só no resultado."""
+    BULLISH = 1
+    BEARISH = -1
+    NEUTRAL = 0
+
+
+class BBPos(IntEnum):
+    """Posição do preço nas Bandas de Bollinger."""
+    BELOW_LOWER = -2
+    LOWER_HALF = -1
+    MIDDLE = 0
+    UPPER_HALF = 1
+    ABOVE_UPPER = 2
+
+
+class Reason(IntFlag):
+    """Regras que pontuaram no sinal determinístico (reason_mask do kernel)."""
+    TREND = REASON_TREND
+    RSI_CONFIRM = REASON_RSI_CONFIRM
+    RSI_MOMENTUM = REASON_RSI_MOMENTUM
+    RSI_OVERSOLD = REASON_RSI_OVERSOLD
+    RSI_LOW = REASON_RSI_LOW
+    RSI_OVERBOUGHT = REASON_RSI_OVERBOUGHT
+    RSI_HIGH = REASON_RSI_HIGH
+    BB = REASON_BB
+
+
+# Texto de cada motivo, na ordem de exibição
+_REASON_TEMPLATES = (
+    (Reason.TREND, "MAs {trend} {strong} (score: {ma_score})"),
+    (Reason.RSI_CONFIRM, "RSI confirma {direction} ({rsi})"),
+    (Reason.RSI_MOMENTUM, "RSI momentum forte ({rsi})"),
+    (Reason.RSI_OVERSOLD, "RSI oversold ({rsi}) - potencial reversão"),
+    (Reason.RSI_LOW, "RSI baixo ({rsi})"),
+    (Reason.RSI_OVERBOUGHT, "RSI overbought ({rsi}) - potencial reversão"),
+    (Reason.RSI_HIGH, "RSI alto ({rsi})"),
+    (Reason.BB, "{bb}"),
+)
+
+
+# Strings da Twelve Data/LLM -> enums (convertidas uma vez na entrada)
+_SIGNAL_CODE = {signal.name: signal for signal in Signal}
+_BB_CODE = {position.name: position for position in BBPos}
+_TREND_LABEL = {Signal.BULLISH: "bullish", Signal.BEARISH: "bearish"}
+
+
+# Campos principais de get_technical_analysis(), extraídos numa chamada
+_EXTRACT = itemgetter("current_price", "rsi", "bollinger_bands", "moving_averages")
+
+# raw_data achatado para o Risk Commander: (chave, origem, chave na origem, default).
+# Defaults compartilhados entre rodadas: raw_data é só leitura
+_FLAT_FIELDS = (
+    # Basic info
+    ("symbol", "tech", "symbol", "EUR/USD"),
+    ("candles_analyzed", "tech", "candles_analyzed", 0),
+    # RSI
+    ("rsi", "rsi", "rsi", 50),
+    ("rsi_condition", "rsi", "condition", "NEUTRAL"),
+    # Bollinger Bands
+    ("bb_position", "bb", "position", "MIDDLE"),
+    # ATR Volatility
+    ("atr", "atr", "atr", 0),
+    ("atr_pips", "atr", "atr_pips", 0),
+    ("volatility", "atr", "volatility", "NORMAL"),
+    ("volatility_factor", "atr", "volatility_factor", 1.0),
+    # Moving Averages
+    ("trend", "ma", "trend", "NEUTRAL"),
+    ("trend_score", "ma", "trend_score", 0),
+    ("ma_signals", "ma", "trend_signals", []),
+    ("ma_20", "ma", "MA_20", 0),
+    ("ma_50", "ma", "MA_50", 0),
+    ("ma_200", "ma", "MA_200", 0),
+    # Candlestick patterns
+    ("patterns", "tech", "candlestick_patterns", []),
+    # Multi-Timeframe Analysis
+    ("mtf_confluence_direction", "mtf", "direction", None),
+    ("mtf_confluence_score", "mtf", "score", 0),
+    ("mtf_confluence_message", "mtf", "message", ""),
+    ("mtf_signals", "mtf", "signals", []),
+    ("mtf_divergence", "mtf", "divergence", False),
+    ("mtf_timeframes", "mtf_analysis", "timeframes", {}),
+)
+
+
+# Motivo das Bollinger: _BB_REASON[strong_trend][t + 1][b + 2]
+# - sem trend forte: reversão à média
+# - trend forte: preço na metade/fora da banda a favor da tendência
+_BB_REVERSION_REASON = (
+    "Preço abaixo Bollinger inferior",
+    "Preço na metade inferior BB",
+    None,
+    "Preço na metade superior BB",
+    "Preço acima Bollinger superior",
+)
+_BB_REASON = (
+    tuple(_BB_REVERSION_REASON for t in range(-1, 2)),
+    tuple(
+        tuple(
+            f"Preço rompendo Bollinger (trend {_TREND_LABEL[t]})" if t * b > 0 else None
+            for b in range(-2, 3)
+        )
+        for t in range(-1, 2)
+    ),
+)
+
+
+# Ajuste MTF da confiança, pré-calculado:
+# - bônus por faixa de 5 pontos do score de confluência (0-100), máximo +15%
+# - divergência: -10%, com piso de 40% (indexado pela confiança 0-100)
+_MTF_BONUS = tuple(min(bucket, 15) for bucket in range(21))
+_DIVERGENCE_CONFIDENCE = tuple(max(confidence - 10, 40) for confidence in range(101))
+
+# Níveis de saída em inteiros: 1 pipette = 0.00001 (5ª casa do EUR/USD)
+_PIPETTES_PER_UNIT = 100_000
+# (SL, TP) em centésimos de ATR
+_TRADE_MULTS = (150, 250)
+_NEUTRAL_MULTS = (75, 125)
+
+
+def _div_round(numerator: int, denominator: int) -> int:
+    """Divisão inteira arredondada (meio para cima) para valores positivos."""
+    return (numerator + denominator // 2) // denominator
+
+
+# Papel enviado ao LLM (prompt de sistema)
+_QUANT_ROLE: Final[str] = """Analista Quantitativo especializado em análise técnica de Forex.
+        
+Você analisa:
+1. Médias Móveis (20, 50, 200) - Tendência de curto, médio e longo prazo
+2. RSI (14 períodos) - Condições de sobrecompra/sobrevenda
+3. Bandas de Bollinger - Volatilidade e posição do preço
+4. Padrões de Candlesticks - Reversões e continuações
+
+Sua análise deve ser objetiva, baseada APENAS nos dados técnicos.
+Não considere notícias ou eventos macroeconômicos - outros agentes fazem isso."""
+
+
 class QuantAnalystAgent(BaseAgent):
     """
     @Quant_Analyst - Especialista em Análise Técnica
@@ -25,34 +177,22 @@ class QuantAnalystAgent(BaseAgent):
     - Calcular níveis de TP/SL para execução precisa
     """
     
-    @property
-    def name(self) -> str:
-        return "@Quant_Analyst"
-    
-    @property
-    def role(self) -> str:
-        return """Analista Quantitativo especializado em análise técnica de Forex.
-        
-Você analisa:
-1. Médias Móveis (20, 50, 200) - Tendência de curto, médio e longo prazo
-2. RSI (14 períodos) - Condições de sobrecompra/sobrevenda
-3. Bandas de Bollinger - Volatilidade e posição do preço
-4. Padrões de Candlesticks - Reversões e continuações
-
-Sua análise deve ser objetiva, baseada APENAS nos dados técnicos.
-Não considere notícias ou eventos macroeconômicos - outros agentes fazem isso."""
+    # Constantes de classe (sem property): lidas a cada análise/log
+    name = "@Quant_Analyst"
+    role = _QUANT_ROLE
     
     def _calculate_exit_levels(
         self,
-        signal: str,
+        signal: Signal,
         current_price: float,
         atr_data: dict[str, Any],
-        bollinger: dict[str, Any] | None = None,
         rsi: dict[str, Any] | None = None
     ) -> dict[str, Any]:
         """
         Calcula níveis de Take Profit (TP) e Stop Loss (SL) baseados em ATR.
         
+        Função pura (só CPU, microssegundos): chamada direto no event loop.
+        
         ATR (Average True Range) adapta os níveis à volatilidade atual:
         - Mercado volátil: TP/SL mais distantes
         - Mercado calmo: TP/SL mais próximos
@@ -66,10 +206,9 @@ Não considere notícias ou eventos macroeconômicos - outros agentes fazem isso
         - LOW volatility: reduz distâncias 0.75x
         
         Args:
-            signal: Sinal técnico (BULLISH/BEARISH/NEUTRAL)
+            signal: Sinal técnico (Signal.BULLISH/BEARISH/NEUTRAL)
             current_price: Preço atual do par
             atr_data: Dados do ATR incluindo volatility_factor
-            bollinger: Dados das Bandas de Bollinger (fallback)
             rsi: Dados do RSI para condição de saída
         
         Returns:
@@ -80,32 +219,35 @@ Não considere notícias ou eventos macroeconômicos - outros agentes fazem isso
         volatility = atr_data.get("volatility", "NORMAL")
         volatility_factor = atr_data.get("volatility_factor", 1.0)
         
-        # Multipliers baseados em volatilidade
-        sl_multiplier = 1.5 * volatility_factor  # 1.5x ATR base
-        tp_multiplier = 2.5 * volatility_factor  # 2.5x ATR base (RR ~1.67)
+        # Aritmética inteira em pipettes (0.00001): sem round() de float no meio.
+        # ATR em centésimos de pipette; volatility_factor e multiplicadores em centésimos
+        price_p = round(current_price * _PIPETTES_PER_UNIT)
+        atr_u = round(atr * _PIPETTES_PER_UNIT * 100)
+        vf_c = round(volatility_factor * 100)
         
-        # Calcula distâncias
-        sl_distance = atr * sl_multiplier
-        tp_distance = atr * tp_multiplier
+        # 1.5x (SL) / 2.5x (TP) ATR → RR ~1.67; NEUTRAL usa metade (0.75x / 1.25x)
+        sl_mult, tp_mult = _NEUTRAL_MULTS if signal is Signal.NEUTRAL else _TRADE_MULTS
+        sl_p = _div_round(atr_u * sl_mult * vf_c, 1_000_000)
+        tp_p = _div_round(atr_u * tp_mult * vf_c, 1_000_000)
         
-        # Converte para pips (1 pip = 0.0001 para EUR/USD)
-        sl_pips = round(sl_distance * 10000, 1)
-        tp_pips = round(tp_distance * 10000, 1)
+        # 1 pip = 10 pipettes (EUR/USD)
+        sl_pips = sl_p / 10
+        tp_pips = tp_p / 10
         
         rsi_value = rsi.get("rsi", 50) if rsi else 50
         
-        if signal == "BULLISH":
-            take_profit = current_price + tp_distance
-            stop_loss = current_price - sl_distance
+        if signal is Signal.BULLISH:
+            take_profit_p = price_p + tp_p
+            stop_loss_p = price_p - sl_p
             
             if rsi_value > 60:
                 exit_condition = f"TP em {tp_pips} pips ou RSI > 70 (sobrecompra)"
             else:
                 exit_condition = f"TP em {tp_pips} pips ou trailing stop"
         
-        elif signal == "BEARISH":
-            take_profit = current_price - tp_distance
-            stop_loss = current_price + sl_distance
+        elif signal is Signal.BEARISH:
+            take_profit_p = price_p - tp_p
+            stop_loss_p = price_p + sl_p
             
             if rsi_value < 40:
                 exit_condition = f"TP em {tp_pips} pips ou RSI < 30 (sobrevenda)"
@@ -113,27 +255,24 @@ Não considere notícias ou eventos macroeconômicos - outros agentes fazem isso
                 exit_condition = f"TP em {tp_pips} pips ou trailing stop"
         
         else:  # NEUTRAL
-            # Sem direção - usar ATR para ambos os lados
-            take_profit = current_price + (tp_distance * 0.5)  # TP menor
-            stop_loss = current_price - (sl_distance * 0.5)    # SL menor
+            # Sem direção - usar ATR para ambos os lados (distâncias já pela metade)
+            take_profit_p = price_p + tp_p
+            stop_loss_p = price_p - sl_p
             exit_condition = "Aguardar confirmação de direção"
-            tp_pips = round(tp_pips * 0.5, 1)
-            sl_pips = round(sl_pips * 0.5, 1)
         
-        # Calcula Risk/Reward ratio
-        potential_gain = abs(take_profit - current_price)
-        potential_loss = abs(current_price - stop_loss)
-        risk_reward = round(potential_gain / potential_loss, 2) if potential_loss > 0 else 0
+        # Risk/Reward: ganho e perda potenciais são as próprias distâncias (centésimos)
+        risk_reward = _div_round(tp_p * 100, sl_p) / 100 if sl_p > 0 else 0
         
+        # Volta para float só no resultado
         return {
-            "take_profit": round(take_profit, 5),
-            "stop_loss": round(stop_loss, 5),
+            "take_profit": take_profit_p / _PIPETTES_PER_UNIT,
+            "stop_loss": stop_loss_p / _PIPETTES_PER_UNIT,
             "exit_condition": exit_condition,
             "risk_reward_ratio": risk_reward,
-            "current_price": round(current_price, 5),
+            "current_price": price_p / _PIPETTES_PER_UNIT,
             # ATR-specific data
             "atr": atr,
-            "atr_pips": round(atr * 10000, 1),
+            "atr_pips": _div_round(atr_u, 100) / 10,
             "volatility": volatility,
             "tp_pips": tp_pips,
             "sl_pips": sl_pips,
@@ -145,10 +284,12 @@ Não considere notícias ou eventos macroeconômicos - outros agentes fazem isso
         moving_averages: dict,
         rsi_data: dict,
         bollinger_data: dict
-    ) -> tuple[str, int, list[str]]:
+    ) -> tuple[Signal, int, list[str]]:
         """
         Calcula sinal técnico de forma DETERMINÍSTICA (sem LLM).
         
+        Função pura (só CPU, microssegundos): chamada direto no event loop.
+        
         ESTRATÉGIA TREND-FOLLOWING para Day Trading:
         - Trend forte (MA score >= 3 ou <= -3): SEGUE o trend
         - RSI é usado para CONFIRMAR trend, não para contra-trend
@@ -157,102 +298,41 @@ Não considere notícias ou eventos macroeconômicos - outros agentes fazem isso
         Returns:
             Tuple[signal, confidence, reasons]
         """
-        score = 0
-        reasons = []
-        
-        # 1. TENDÊNCIA DAS MAs (PESO DOMINANTE)
+        # Categorias viram enums uma vez (comparações de int, não de string)
         ma_trend = moving_averages.get("trend", "NEUTRAL")
         ma_score = moving_averages.get("trend_score", 0)
-        
-        # REGRA CRÍTICA: Trend forte = seguir o trend!
-        # MODO AGRESSIVO: baixamos o threshold de 3 para 2
-        strong_trend = abs(ma_score) >= 2
-        
-        if ma_trend == "BULLISH":
-            score += 3 if strong_trend else 2
-            reasons.append(f"MAs bullish {'FORTE' if strong_trend else ''} (score: {ma_score})")
-        elif ma_trend == "BEARISH":
-            score -= 3 if strong_trend else 2
-            reasons.append(f"MAs bearish {'FORTE' if strong_trend else ''} (score: {ma_score})")
-        
-        # 2. RSI - LÓGICA TREND-FOLLOWING
-        # Em trend forte: RSI extremo CONFIRMA o movimento, não indica reversão
+        t = _SIGNAL_CODE.get(ma_trend, Signal.NEUTRAL)
+        b = _BB_CODE.get(bollinger_data.get("position", "MIDDLE"), BBPos.MIDDLE)
         rsi_value = rsi_data.get("rsi", 50)
         
-        if rsi_value is not None:
-            if strong_trend:
-                # TREND-FOLLOWING: RSI extremo = momentum forte
-                if ma_trend == "BULLISH":
-                    if rsi_value >= 50:
-                        score += 1
-                        reasons.append(f"RSI confirma alta ({rsi_value})")
-                    if rsi_value >= 60:
-                        score += 1
-                        reasons.append(f"RSI momentum forte ({rsi_value})")
-                elif ma_trend == "BEARISH":
-                    if rsi_value <= 50:
-                        score -= 1
-                        reasons.append(f"RSI confirma queda ({rsi_value})")
-                    if rsi_value <= 40:
-                        score -= 1
-                        reasons.append(f"RSI momentum forte ({rsi_value})")
-            else:
-                # SEM TREND FORTE: lógica tradicional de reversão
-                # MODO AGRESSIVO: RSI entre 40-60 também conta
-                if rsi_value <= 30:
-                    score += 2
-                    reasons.append(f"RSI oversold ({rsi_value}) - potencial reversão")
-                elif rsi_value <= 45:
-                    score += 1
-                    reasons.append(f"RSI baixo ({rsi_value})")
-                elif rsi_value >= 70:
-                    score -= 2
-                    reasons.append(f"RSI overbought ({rsi_value}) - potencial reversão")
-                elif rsi_value >= 55:
-                    score -= 1
-                    reasons.append(f"RSI alto ({rsi_value})")
-        
-        # 3. BOLLINGER BANDS (timing de entrada)
-        bb_position = bollinger_data.get("position", "NEUTRAL")
-        
-        if strong_trend:
-            # Em trend forte: preço na banda indica força, não reversão
-            if ma_trend == "BULLISH" and bb_position in ["UPPER_HALF", "ABOVE_UPPER"]:
-                score += 1
-                reasons.append("Preço rompendo Bollinger (trend bullish)")
-            elif ma_trend == "BEARISH" and bb_position in ["LOWER_HALF", "BELOW_LOWER"]:
-                score -= 1
-                reasons.append("Preço rompendo Bollinger (trend bearish)")
-        else:
-            # Sem trend forte: Bollinger tradicional (reversão à média)
-            if bb_position == "BELOW_LOWER":
-                score += 2
-                reasons.append("Preço abaixo Bollinger inferior")
-            elif bb_position == "ABOVE_UPPER":
-                score -= 2
-                reasons.append("Preço acima Bollinger superior")
-            elif bb_position == "LOWER_HALF":
-                score += 1
-                reasons.append("Preço na metade inferior BB")
-            elif bb_position == "UPPER_HALF":
-                score -= 1
-                reasons.append("Preço na metade superior BB")
-        
-        # DETERMINA SINAL FINAL
-        # MODO AGRESSIVO: threshold baixo para mais operações
-        if score >= 1:
-            signal = "BULLISH"
-            confidence = min(60 + (score * 8), 95)
-        elif score <= -1:
-            signal = "BEARISH"
-            confidence = min(60 + (abs(score) * 8), 95)
-        else:
-            signal = "NEUTRAL"
-            confidence = 40
+        # Núcleo numérico (@njit quando numba disponível)
+        signal_code, confidence, mask = score_kernel(
+            int(t),
+            float(ma_score),
+            float("nan") if rsi_value is None else float(rsi_value),
+            int(b)
+        )
+        signal = Signal(signal_code)
+        strong_trend = abs(ma_score) >= 2
         
-        # Log especial para trend forte
-        if strong_trend:
-            reasons.insert(0, f"🔥 TREND FORTE DETECTADO ({ma_trend})")
+        # Texto dos motivos numa única lista já no tamanho final (sem insert/append).
+        # Log especial para trend forte vem primeiro
+        reasons = [f"🔥 TREND FORTE DETECTADO ({ma_trend})"] if strong_trend else []
+        if mask:
+            fields = {
+                "trend": _TREND_LABEL.get(t),
+                "strong": "FORTE" if strong_trend else "",
+                "ma_score": ma_score,
+                "rsi": rsi_value,
+                "direction": "alta" if t is Signal.BULLISH else "queda",
+                "bb": _BB_REASON[strong_trend][t + 1][b + 2]
+            }
+            # Só as regras marcadas no reason_mask são formatadas
+            reasons += [
+                template.format_map(fields)
+                for reason, template in _REASON_TEMPLATES
+                if mask & reason
+            ]
         
         return signal, confidence, reasons
     
@@ -265,6 +345,12 @@ Não considere notícias ou eventos macroeconômicos - outros agentes fazem isso
         2. Consulta LLM para validação
         3. Se LLM retornar NEUTRAL, usa sinal determinístico
         
+        ATALHO MTF: se o sinal final for NEUTRAL com confiança < 50, não há
+        trade a confirmar e a busca Multi-Timeframe (a maior chamada HTTP do
+        tick) é pulada; mtf_analysis/mtf_confluence ficam vazios no raw_data.
+        Isso só acontece com determinístico NEUTRAL < 50 e LLM NEUTRAL, então
+        nesses ticks o MTF só é buscado depois da resposta do LLM.
+        
         Args:
             market_state: Estado do mercado (pode ser ignorado, usamos dados frescos)
         
@@ -276,20 +362,18 @@ Não considere notícias ou eventos macroeconômicos - outros agentes fazem isso
         # Obtém dados técnicos frescos
         technical_data = await twelve_data_client.get_technical_analysis()
         
-        current_price = technical_data["current_price"]
-        rsi_data = technical_data["rsi"]
-        bollinger_data = technical_data["bollinger_bands"]
-        moving_averages = technical_data["moving_averages"]
+        current_price, rsi_data, bollinger_data, moving_averages = _EXTRACT(technical_data)
         atr_data = technical_data.get("atr", {})  # NEW: ATR para TP/SL dinâmico
         
-        self.log("Technical data retrieved", {
-            "price": current_price,
-            "rsi": rsi_data["rsi"],
-            "trend": moving_averages.get("trend"),
-            "trend_score": moving_averages.get("trend_score", 0),
-            "atr_pips": atr_data.get("atr_pips", 0),
-            "volatility": atr_data.get("volatility", "N/A")
-        })
+        if self.log_enabled():
+            self.log("Technical data retrieved", {
+                "price": current_price,
+                "rsi": rsi_data["rsi"],
+                "trend": moving_averages.get("trend"),
+                "trend_score": moving_averages.get("trend_score", 0),
+                "atr_pips": atr_data.get("atr_pips", 0),
+                "volatility": atr_data.get("volatility", "N/A")
+            })
         
         # 1. SINAL DETERMINÍSTICO (objetivo, sem LLM)
         det_signal, det_confidence, det_reasons = self._calculate_deterministic_signal(
@@ -298,35 +382,47 @@ Não considere notícias ou eventos macroeconômicos - outros agentes fazem isso
             bollinger_data=bollinger_data
         )
         
-        self.log("Deterministic signal calculated", {
-            "signal": det_signal,
-            "confidence": det_confidence,
-            "reasons": det_reasons
-        })
+        if self.log_enabled():
+            self.log("Deterministic signal calculated", {
+                "signal": det_signal.name,
+                "confidence": det_confidence,
+                "reasons": det_reasons
+            })
         
         # 2. VALIDAÇÃO LLM (opcional, pode confirmar ou divergir)
-        llm_analysis = await self.reason(technical_data)
-        llm_signal = llm_analysis.get("signal", "NEUTRAL")
+        # A chamada LLM e a busca Multi-Timeframe são independentes: rodam juntas,
+        # exceto quando o determinístico é NEUTRAL fraco (o MTF pode ser pulado)
+        mtf_task = None
+        if det_signal is not Signal.NEUTRAL or det_confidence >= 50:
+            self.log("Running Multi-Timeframe Analysis")
+            mtf_task = asyncio.create_task(twelve_data_client.get_multi_timeframe_analysis())
+        try:
+            llm_analysis = await self.reason(technical_data)
+        except BaseException:
+            if mtf_task is not None:
+                mtf_task.cancel()
+            raise
+        llm_signal = _SIGNAL_CODE.get(llm_analysis.get("signal"), Signal.NEUTRAL)
         
         # 3. DECISÃO FINAL (híbrida)
         # Prioridade: determinístico, LLM como validação
-        if det_signal != "NEUTRAL":
+        if det_signal is not Signal.NEUTRAL:
             # Confiamos no sinal determinístico
             final_signal = det_signal
             final_confidence = det_confidence
             
             # Bônus se LLM concordar
-            if llm_signal == det_signal:
+            if llm_signal is det_signal:
                 final_confidence = min(final_confidence + 10, 95)
                 self.log("LLM confirms deterministic signal", level="info")
-        elif llm_signal != "NEUTRAL":
+        elif llm_signal is not Signal.NEUTRAL:
             # Determinístico é neutro, mas LLM viu algo
             final_signal = llm_signal
             final_confidence = llm_analysis.get("confidence_score", 55)
             self.log("Using LLM signal (deterministic was neutral)", level="info")
         else:
             # Ambos neutros
-            final_signal = "NEUTRAL"
+            final_signal = Signal.NEUTRAL
             final_confidence = det_confidence
         
         # Calcula níveis de TP/SL usando ATR dinâmico
@@ -334,103 +430,84 @@ Não considere notícias ou eventos macroeconômicos - outros agentes fazem isso
             signal=final_signal,
             current_price=current_price,
             atr_data=atr_data,  # ATR como base principal
-            bollinger=bollinger_data,
             rsi=rsi_data
         )
         
-        self.log("Exit levels calculated (ATR-based)", {
-            "take_profit": exit_levels["take_profit"],
-            "stop_loss": exit_levels["stop_loss"],
-            "risk_reward": exit_levels["risk_reward_ratio"],
-            "tp_pips": exit_levels.get("tp_pips"),
-            "sl_pips": exit_levels.get("sl_pips"),
-            "volatility": exit_levels.get("volatility")
-        })
+        if self.log_enabled():
+            self.log("Exit levels calculated (ATR-based)", {
+                "take_profit": exit_levels["take_profit"],
+                "stop_loss": exit_levels["stop_loss"],
+                "risk_reward": exit_levels["risk_reward_ratio"],
+                "tp_pips": exit_levels.get("tp_pips"),
+                "sl_pips": exit_levels.get("sl_pips"),
+                "volatility": exit_levels.get("volatility")
+            })
         
         # ============== MULTI-TIMEFRAME ANALYSIS ==============
-        # Busca confluência em M5, M15, H1, H4
+        # Confluência em M5, M15, H1, H4 (buscada junto com a chamada LLM)
         mtf_analysis = None
         mtf_confluence = None
         
-        try:
-            self.log("Running Multi-Timeframe Analysis")
-            mtf_analysis = await twelve_data_client.get_multi_timeframe_analysis()
-            mtf_confluence = mtf_analysis.get("confluence", {})
+        if final_signal is Signal.NEUTRAL and final_confidence < 50:
+            # Sem trade a confirmar: MTF não muda a decisão
+            self.log("Skipping Multi-Timeframe Analysis (weak NEUTRAL)")
+        else:
+            try:
+                if mtf_task is None:
+                    self.log("Running Multi-Timeframe Analysis")
+                    mtf_task = twelve_data_client.get_multi_timeframe_analysis()
+                mtf_analysis = await mtf_task
+                mtf_confluence = mtf_analysis.get("confluence", {})
             
-            self.log("MTF Analysis complete", {
-                "confluence_direction": mtf_confluence.get("direction"),
-                "confluence_score": mtf_confluence.get("score"),
-                "signals": mtf_confluence.get("signals")
-            })
+                if self.log_enabled():
+                    self.log("MTF Analysis complete", {
+                        "confluence_direction": mtf_confluence.get("direction"),
+                        "confluence_score": mtf_confluence.get("score"),
+                        "signals": mtf_confluence.get("signals")
+                    })
             
-            # AJUSTA CONFIANÇA baseado em confluência MTF
-            if mtf_confluence.get("direction") == final_signal:
-                # Confluência confirma nosso sinal - aumenta confiança
-                confluence_bonus = min(mtf_confluence.get("score", 0) // 5, 15)  # Max +15%
-                final_confidence = min(final_confidence + confluence_bonus, 98)
-                det_reasons.append(f"MTF Confluência {mtf_confluence.get('direction')} ({mtf_confluence.get('bullish_count')}/{mtf_confluence.get('bearish_count')} TFs)")
-                self.log(f"MTF confirms signal, +{confluence_bonus}% confidence", level="info")
-            elif mtf_confluence.get("direction") in ["BULLISH", "BEARISH"] and mtf_confluence.get("direction") != final_signal:
-                # Divergência - reduz confiança
-                final_confidence = max(final_confidence - 10, 40)
-                det_reasons.append(f"⚠️ Divergência MTF: {mtf_confluence.get('direction')}")
-                self.log("MTF diverges from signal, -10% confidence", level="warning")
-        except Exception as e:
-            self.log(f"MTF Analysis failed: {e}", level="warning")
-            mtf_analysis = {"error": str(e)}
+                # AJUSTA CONFIANÇA baseado em confluência MTF
+                mtf_direction = _SIGNAL_CODE.get(mtf_confluence.get("direction"))  # None se ausente
+                if mtf_direction is final_signal:
+                    # Confluência confirma nosso sinal - aumenta confiança
+                    confluence_bonus = _MTF_BONUS[min(mtf_confluence.get("score", 0) // 5, 20)]
+                    final_confidence = min(final_confidence + confluence_bonus, 98)
+                    det_reasons.append(f"MTF Confluência {mtf_confluence.get('direction')} ({mtf_confluence.get('bullish_count')}/{mtf_confluence.get('bearish_count')} TFs)")
+                    self.log(f"MTF confirms signal, +{confluence_bonus}% confidence", level="info")
+                elif mtf_direction in (Signal.BULLISH, Signal.BEARISH):
+                    # Divergência - reduz confiança
+                    final_confidence = _DIVERGENCE_CONFIDENCE[final_confidence]
+                    det_reasons.append(f"⚠️ Divergência MTF: {mtf_confluence.get('direction')}")
+                    self.log("MTF diverges from signal, -10% confidence", level="warning")
+            except Exception as e:
+                self.log(f"MTF Analysis failed: {e}", level="warning")
+                mtf_analysis = {"error": str(e)}
 
         # ============== FLATTEN RAW_DATA FOR RISK COMMANDER ==============
-        # Risk Commander expects flattened keys, not nested structures
+        # Risk Commander expects flattened keys, not nested structures.
+        # Só as chaves achatadas: os dicts originais não são repetidos aqui
+        sources = {
+            "tech": technical_data,
+            "rsi": rsi_data,
+            "bb": bollinger_data,
+            "atr": atr_data,
+            "ma": moving_averages,
+            "mtf": mtf_confluence or {},
+            "mtf_analysis": mtf_analysis or {}
+        }
         flattened_raw_data = {
-            # Basic info
             "timestamp": technical_data["timestamp"],
-            "symbol": technical_data.get("symbol", "EUR/USD"),
-            "candles_analyzed": technical_data.get("candles_analyzed", 0),
-            
             # Price (required by Risk Commander)
             "price": current_price,
             "current_price": current_price,
-            
-            # RSI (flattened)
-            "rsi": rsi_data.get("rsi", 50),
-            "rsi_condition": rsi_data.get("condition", "NEUTRAL"),
-            
-            # Bollinger Bands (flattened)
+            # Bollinger Bands: defaults relativos ao preço
             "bb_upper": bollinger_data.get("upper", current_price * 1.01),
             "bb_middle": bollinger_data.get("middle", current_price),
             "bb_lower": bollinger_data.get("lower", current_price * 0.99),
-            "bb_position": bollinger_data.get("position", "MIDDLE"),
-            
-            # ATR Volatility (NEW!)
-            "atr": atr_data.get("atr", 0),
-            "atr_pips": atr_data.get("atr_pips", 0),
-            "volatility": atr_data.get("volatility", "NORMAL"),
-            "volatility_factor": atr_data.get("volatility_factor", 1.0),
-            
-            # Moving Averages
-            "trend": moving_averages.get("trend", "NEUTRAL"),
-            "trend_score": moving_averages.get("trend_score", 0),
-            "ma_signals": moving_averages.get("trend_signals", []),
-            "ma_20": moving_averages.get("MA_20", 0),
-            "ma_50": moving_averages.get("MA_50", 0),
-            "ma_200": moving_averages.get("MA_200", 0),
-            
-            # Candlestick patterns
-            "patterns": technical_data.get("candlestick_patterns", []),
-            
-            # Multi-Timeframe Analysis (NEW!)
-            "mtf_confluence_direction": mtf_confluence.get("direction") if mtf_confluence else None,
-            "mtf_confluence_score": mtf_confluence.get("score", 0) if mtf_confluence else 0,
-            "mtf_confluence_message": mtf_confluence.get("message", "") if mtf_confluence else "",
-            "mtf_signals": mtf_confluence.get("signals", []) if mtf_confluence else [],
-            "mtf_divergence": mtf_confluence.get("divergence", False) if mtf_confluence else False,
-            "mtf_timeframes": mtf_analysis.get("timeframes", {}) if mtf_analysis else {},
-            
-            # Original nested data (for reference)
-            "moving_averages": moving_averages,
-            "rsi_data": rsi_data,
-            "bollinger_bands": bollinger_data,
-            "mtf_analysis": mtf_analysis
+            **{
+                out_key: sources[source].get(key, default)
+                for out_key, source, key, default in _FLAT_FIELDS
+            }
         }
         
         # Combina dados técnicos com análise
@@ -440,26 +517,30 @@ Não considere notícias ou eventos macroeconômicos - outros agentes fazem isso
             "raw_data": flattened_raw_data,
             "llm_analysis": llm_analysis,
             "deterministic_analysis": {
-                "signal": det_signal,
+                "signal": det_signal.name,
                 "confidence": det_confidence,
                 "reasons": det_reasons
             },
             "deterministic_reasons": det_reasons,  # Also at top level for Risk Commander
-            "signal": final_signal,
+            "signal": final_signal.name,
             "confidence": final_confidence,
             "exit_levels": exit_levels
         }
         
         # Log com destaque se não for neutro
-        log_level = "warning" if final_signal != "NEUTRAL" else "info"
-        self.log("Analysis complete", {
-            "signal": result["signal"],
-            "confidence": result["confidence"]
-        }, level=log_level)
+        log_level = "warning" if final_signal is not Signal.NEUTRAL else "info"
+        if self.log_enabled(log_level):
+            self.log("Analysis complete", {
+                "signal": result["signal"],
+                "confidence": result["confidence"]
+            }, level=log_level)
         
         return result
 
 
 
+# Compila o kernel em BaseAgent.warmup(), fora da primeira análise
+BaseAgent._WARMUP_KERNELS.append((score_kernel, (1, 3.0, 55.0, 1)))
+
 # Singleton
 quant_analyst = QuantAnalystAgent()
@@ -6,20 +6,274 @@ Arquitetura LLM-First: A IA tem SOBERANIA TOTAL sobre as decisões.
 Zero cálculos matemáticos - 100% inteligência artificial.
 """
 
+import asyncio
+from bisect import bisect_right
+from contextlib import aclosing
 from datetime import datetime, timedelta
-from typing import Any, Literal
-import json
-import re
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Any, Final, Literal, TypedDict, cast
+import sys
+
+import httpx
+import orjson
 
 from agents.base import BaseAgent
+from agents.llm_cache import AICache
 from utils.trade_memory import trade_memory
 
 
 # Type aliases
-Decision = Literal["ENTRY", "HOLD"]
+Decision = Literal["ENTRY", "HOLD"]           # decisão bruta do CIO
+FinalDecision = Literal["BUY", "SELL", "HOLD"]  # decisão publicada (RiskDecision)
 Direction = Literal["BUY", "SELL"]
 
 
+class SupabaseRecord(TypedDict):
+    """Linha de trade_signals gravada a partir do veredito."""
+    pair: str
+    technical_signal: dict[str, Any]
+    sentiment_score: float
+    macro_alert: str
+    final_decision: str
+    reasoning: str
+    market_bias: str
+    scheduled_entry: dict[str, Any] | None
+    exit_levels: dict[str, Any] | None  # None no veto
+
+
+class RiskDecision(TypedDict):
+    """
+    Veredito do @Risk_Commander (analyze e veto Black Swan).
+    
+    Dict simples em runtime (estado do LangGraph, logs, Supabase); o tipo
+    só fixa as chaves para o checker.
+    """
+    agent: str
+    decision: FinalDecision
+    direction: Direction | None
+    confidence: int
+    reasoning: str
+    signal_strength: str
+    llm_validation: dict[str, Any]
+    timestamp: str
+    market_bias: str
+    scheduled_entry: dict[str, Any] | None
+    exit_levels: dict[str, Any]
+    inputs: dict[str, Any]
+    supabase_record: SupabaseRecord
+
+# Confidence override: sinal técnico -> direção forçada (NEUTRAL não força)
+_OVERRIDE_DIRECTION = {"BULLISH": "BUY", "BEARISH": "SELL"}
+
+# Viés de mercado por direção (sem direção = Lateralizado)
+_BIAS_MAP = {"BUY": "Alta", "SELL": "Baixa"}
+
+# Força do sinal por faixa de confiança: <50 FRACO, 50-74 MODERADO, >=75 FORTE
+_STRENGTH_THRESHOLDS = (50, 75)
+_STRENGTH_LABELS = ("FRACO", "MODERADO", "FORTE")
+
+# Normalização (decision, direction) da IA -> (final_decision, direction).
+# Qualquer combinação fora da tabela vira HOLD sem direção.
+_VERDICT_TABLE: dict[tuple[str, str | None], tuple[FinalDecision, Direction | None]] = {
+    ("ENTRY", "BUY"): ("BUY", "BUY"),
+    ("ENTRY", "SELL"): ("SELL", "SELL"),
+}
+_HOLD_VERDICT: tuple[FinalDecision, Direction | None] = ("HOLD", None)
+
+# Conjuntos fixos para testes de pertinência (sem lista por chamada)
+_TRADE_DECISIONS: Final = frozenset({"BUY", "SELL"})
+
+# Prefixo estável do prompt do CIO (Estilo: Wolf of Wall Street / Ray Dalio).
+# Vai como prompt de sistema, sempre igual: os dados da mesa vão na mensagem
+# do usuário (_build_cio_prompt), depois dele, para o prefixo cair no cache.
+_CIO_SYSTEM_PREFIX: Final[str] = """Você é o CIO (Chief Investment Officer) e Estrategista Chefe da 3virgulas, uma lenda do mercado financeiro conhecida por transformar dados complexos em lucros bilionários. Sua reputação foi construída sobre duas regras: 1) Nunca perca dinheiro. 2) Seja agressivo quando a probabilidade estiver a seu favor.
+
+Sua tarefa é analisar os relatórios dos seus analistas (Quant, Sentiment, Macro), enviados em DADOS DA MESA, e tomar a DECISÃO FINAL DE EXECUÇÃO.
+
+DIRETRIZES DE ELITE:
+1. CONFLUÊNCIA MULTI-TIMEFRAME (CRÍTICO): Priorize sinais com confluência em múltiplos timeframes (M5/M15/H1/H4). Se 3+ timeframes concordam = alta probabilidade. Se há divergência H4 vs M5 = cautela.
+2. TRADE MEMORY: Considere os insights históricos. Se o sistema aprendeu que certa condição tem baixo win rate, ajuste sua confiança de acordo.
+3. SOBERANIA TÉCNICA: Se o gráfico (Quant) mostrar um padrão de alta probabilidade com MTF confluente, ignore ruídos de sentimento neutro.
+4. CAÇADOR DE ASSIMETRIA: Só recomende entrada se o potencial de lucro for maior que o risco (min 1:1.5 RR).
+5. PRECISÃO CIRÚRGICA: Defina Entry, TP e SL baseados na volatilidade e níveis técnicos fornecidos. Não chute valores.
+6. SEM HESITAÇÃO: Se for HOLD, diga o porquê. Se for ENTRY, seja convicto. Confiança 65% é para amadores; busque convicção > 80%.
+
+Retorne EXCLUSIVAMENTE este JSON (sem markdown):
+{
+  "decision": "ENTRY" ou "HOLD",
+  "direction": "BUY" ou "SELL",
+  "confidence": 0-100,
+  "entry_price": 0.00000,
+  "take_profit": 0.00000,
+  "stop_loss": 0.00000,
+  "reasoning": "Sua tese de investimento em uma frase de impacto."
+}"""
+
+# Saída estruturada do CIO (json_schema): o provedor só emite JSON válido no
+# schema, sem markdown nem prosa. Modelos sem suporte ignoram o campo e
+# _parse_llm_response continua cobrindo a resposta livre.
+_CIO_RESPONSE_FORMAT: Final[dict[str, Any]] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "cio_decision",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "decision": {"type": "string", "enum": ["ENTRY", "HOLD"]},
+                "direction": {"type": ["string", "null"], "enum": ["BUY", "SELL", None]},
+                "confidence": {"type": "integer"},
+                "entry_price": {"type": "number"},
+                "take_profit": {"type": "number"},
+                "stop_loss": {"type": "number"},
+                "reasoning": {"type": "string"}
+            },
+            "required": [
+                "decision", "direction", "confidence",
+                "entry_price", "take_profit", "stop_loss", "reasoning"
+            ],
+            "additionalProperties": False
+        }
+    }
+}
+
+# Dados da mesa no prompt: chaves ordenadas (texto canônico para os caches)
+_DESK_JSON_OPTS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Poda dos dados da mesa (prefill é linear no tamanho do prompt)
+_PROMPT_STR_MAX = 200   # textos livres (reasoning do quant, mensagem macro)
+_HEADLINE_MAX = 80      # cada manchete do Finnhub
+
+# Chave estável do prefixo para o prompt caching do provedor
+_CIO_PROMPT_CACHE_KEY = f"@Risk_Commander:cio:{blake2b(_CIO_SYSTEM_PREFIX.encode(), digest_size=8).hexdigest()}"
+
+# Pedido fixo ao CIO, no fim da mensagem com os dados
+_CIO_USER_MESSAGE = "Analise e tome sua decisão. Retorne APENAS o JSON."
+
+# Respostas do CIO por hash do prompt: snapshots idênticos não repagam o LLM
+_CIO_CACHE = AICache(ttl=300.0, maxsize=512)
+
+# Reasoning do fallback de parse
+_PARSE_ERROR_REASONING = "Erro ao processar resposta da IA"
+
+# Textos fixos do veredito: template parseado uma vez, formatado via método ligado
+_BLACK_SWAN_REASON = "BLACK SWAN: Risco extremo detectado. {} evento(s) de alto impacto iminente(s).".format
+_MACRO_VETO_REASON = "VETO MACRO: {} evento(s) de alto impacto nos próximos 30 min.".format
+_EXIT_CONDITION = "TP: {:.5f} | SL: {:.5f}".format
+_ENTRY_INSTRUCTION = "Aguardar confirmação de volume no horário sugerido"
+
+# Papel enviado ao LLM (prompt de sistema)
+_RISK_ROLE: Final[str] = """CIO (Chief Investment Officer) e Estrategista Chefe da 3virgulas.
+        
+Você é uma lenda do mercado financeiro. Sua reputação foi construída sobre duas regras:
+1) Nunca perca dinheiro. 
+2) Seja agressivo quando a probabilidade estiver a seu favor.
+
+Você recebe relatórios de:
+- @Quant_Analyst: Análise técnica (RSI, Bandas, MAs, Suporte/Resistência)
+- @Sentiment_Pulse: Análise de sentimento do mercado
+- @Macro_Watcher: Calendário econômico e riscos macro
+
+Seu veredito é FINAL e SOBERANO."""
+
+
+@lru_cache(maxsize=128)
+def _black_swan_verdict(alert: str, high_impact: int) -> tuple[bool, str | None]:
+    """
+    Veto Black Swan para o snapshot macro (alert, high_impact_events).
+    
+    Função pura de dois escalares: o calendário muda ~1x/hora, então ticks
+    seguidos reaproveitam o veredito e a mensagem já formatada.
+    """
+    # Veto apenas para EXTREME_RISK com eventos iminentes
+    if alert == "EXTREME_RISK":
+        return True, _BLACK_SWAN_REASON(high_impact)
+    
+    # HIGH_RISK com eventos próximos também é veto
+    if alert == "HIGH_RISK" and high_impact > 0:
+        return True, _MACRO_VETO_REASON(high_impact)
+    
+    return False, None
+
+
+def _risk_reward(entry: float, take_profit: float, stop_loss: float) -> float:
+    """
+    Relação risco/retorno dos níveis do CIO (0 se não houver TP/SL).
+    
+    Vale para BUY e SELL sem olhar a direção: em SELL (TP < entrada < SL)
+    numerador e denominador são ambos negativos.
+    """
+    if not (take_profit and stop_loss) or entry == stop_loss:
+        return 0
+    return round((take_profit - entry) / (entry - stop_loss), 2)
+
+
+def _prune_for_prompt(value: Any) -> Any:
+    """
+    Cópia de value sem campos vazios (None, "", [], {}) e com textos longos
+    truncados, para os dados da mesa no prompt do CIO.
+    
+    Zeros, False e "NEUTRAL" ficam: são leitura de mercado (ex.: should_trade,
+    divergence_warning), não ausência de dado.
+    """
+    if isinstance(value, dict):
+        pruned = {}
+        for key, item in value.items():
+            item = _prune_for_prompt(item)
+            if item is None or (isinstance(item, (str, list, dict)) and not item):
+                continue
+            pruned[key] = item
+        return pruned
+    if isinstance(value, list):
+        return [
+            item for item in map(_prune_for_prompt, value)
+            if item is not None and not (isinstance(item, (str, list, dict)) and not item)
+        ]
+    if isinstance(value, str) and len(value) > _PROMPT_STR_MAX:
+        return value[:_PROMPT_STR_MAX] + "..."
+    return value
+
+
+class _JsonObjectScanner:
+    """
+    Acompanha um texto JSON em pedaços até o objeto de topo fechar.
+    
+    Conta a profundidade de chaves fora de strings (respeitando escapes),
+    então o fechamento é achado em O(n) mesmo com objetos aninhados.
+    """
+    
+    __slots__ = ("depth", "in_string", "escaped", "started")
+    
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+    
+    def feed(self, chunk: str) -> int:
+        """Consome chunk; retorna o índice logo após a '}' de fechamento, ou -1."""
+        for i, ch in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                if self.started:
+                    self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+                self.started = True
+            elif ch == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
+
 class RiskCommanderAgent(BaseAgent):
     """
     @Risk_Commander - CIO (Chief Investment Officer)
@@ -33,36 +287,29 @@ class RiskCommanderAgent(BaseAgent):
     Filosofia: "Seja agressivo quando a probabilidade estiver a seu favor."
     """
     
+    # Sem estado próprio (nenhum __dict__ por instância)
+    __slots__ = ()
+    
     # Entry Window config (minutos)
     ENTRY_WINDOW_START_MINUTES = 3
     ENTRY_WINDOW_END_MINUTES = 5
+    _ENTRY_START_DELTA = timedelta(minutes=ENTRY_WINDOW_START_MINUTES)
+    _ENTRY_END_DELTA = timedelta(minutes=ENTRY_WINDOW_END_MINUTES)
     
     # Veto window (minutos)
     BLACK_SWAN_VETO_MINUTES = 30
     
-    @property
-    def name(self) -> str:
-        return "@Risk_Commander"
-    
-    @property
-    def role(self) -> str:
-        return """CIO (Chief Investment Officer) e Estrategista Chefe da 3virgulas.
-        
-Você é uma lenda do mercado financeiro. Sua reputação foi construída sobre duas regras:
-1) Nunca perca dinheiro. 
-2) Seja agressivo quando a probabilidade estiver a seu favor.
-
-Você recebe relatórios de:
-- @Quant_Analyst: Análise técnica (RSI, Bandas, MAs, Suporte/Resistência)
-- @Sentiment_Pulse: Análise de sentimento do mercado
-- @Macro_Watcher: Calendário econômico e riscos macro
-
-Seu veredito é FINAL e SOBERANO."""
+    # Constantes de classe (sem property): lidas a cada análise/log
+    name = "@Risk_Commander"
+    role = _RISK_ROLE
     
     def _build_cio_prompt(self, raw_data: dict[str, Any]) -> str:
         """
-        Constrói o prompt do CIO (Chief Investment Officer).
-        Estilo: Wolf of Wall Street / Ray Dalio.
+        Constrói a parte volátil do prompt do CIO (mensagem do usuário).
+        
+        Só os dados da mesa e o Trade Memory mudam entre chamadas; as
+        diretrizes e o schema ficam em _CIO_SYSTEM_PREFIX, idêntico em toda
+        chamada, para o provedor reaproveitar o prompt caching do prefixo.
         """
         # Trade Memory insights (se disponível)
         trade_memory_section = ""
@@ -80,59 +327,45 @@ Ajuste de Confiança Sugerido: {memory_data.get('confidence_adjustment', 0):+d}%
 Considere este veto do sistema de aprendizado.
 """
         
-        return f"""Você é o CIO (Chief Investment Officer) e Estrategista Chefe da 3virgulas, uma lenda do mercado financeiro conhecida por transformar dados complexos em lucros bilionários. Sua reputação foi construída sobre duas regras: 1) Nunca perca dinheiro. 2) Seja agressivo quando a probabilidade estiver a seu favor.
-
-Sua tarefa é analisar os relatórios dos seus analistas (Quant, Sentiment, Macro) e tomar a DECISÃO FINAL DE EXECUÇÃO.
-
-DADOS DA MESA:
-{json.dumps(raw_data, indent=2, ensure_ascii=False)}
+        return f"""DADOS DA MESA:
+{orjson.dumps(_prune_for_prompt(raw_data), option=_DESK_JSON_OPTS, default=str).decode()}
 {trade_memory_section}
-DIRETRIZES DE ELITE:
-1. CONFLUÊNCIA MULTI-TIMEFRAME (CRÍTICO): Priorize sinais com confluência em múltiplos timeframes (M5/M15/H1/H4). Se 3+ timeframes concordam = alta probabilidade. Se há divergência H4 vs M5 = cautela.
-2. TRADE MEMORY: Considere os insights históricos. Se o sistema aprendeu que certa condição tem baixo win rate, ajuste sua confiança de acordo.
-3. SOBERANIA TÉCNICA: Se o gráfico (Quant) mostrar um padrão de alta probabilidade com MTF confluente, ignore ruídos de sentimento neutro.
-4. CAÇADOR DE ASSIMETRIA: Só recomende entrada se o potencial de lucro for maior que o risco (min 1:1.5 RR).
-5. PRECISÃO CIRÚRGICA: Defina Entry, TP e SL baseados na volatilidade e níveis técnicos fornecidos. Não chute valores.
-6. SEM HESITAÇÃO: Se for HOLD, diga o porquê. Se for ENTRY, seja convicto. Confiança 65% é para amadores; busque convicção > 80%.
-
-Retorne EXCLUSIVAMENTE este JSON (sem markdown):
-{{
-  "decision": "ENTRY" ou "HOLD",
-  "direction": "BUY" ou "SELL",
-  "confidence": 0-100,
-  "entry_price": 0.00000,
-  "take_profit": 0.00000,
-  "stop_loss": 0.00000,
-  "reasoning": "Sua tese de investimento em uma frase de impacto."
-}}"""
+{_CIO_USER_MESSAGE}"""
     
-    def _parse_llm_response(self, response: str) -> dict[str, Any]:
+    def _parse_llm_response(self, response: str) -> tuple[dict[str, Any], bool]:
         """
         Extrai JSON da resposta do LLM.
         Robusto para lidar com markdown ou texto extra.
+        
+        Returns:
+            (decisão, parse_ok). parse_ok=False indica o fallback HOLD, que
+            nunca deve entrar em cache.
         """
-        try:
-            # Tenta parse direto
-            return json.loads(response)
-        except json.JSONDecodeError:
-            pass
-        
-        # Remove markdown code blocks se existir
-        json_match = re.search(r'\{[^{}]*\}', response, re.DOTALL)
-        if json_match:
+        if response.lstrip().startswith("{"):
             try:
-                return json.loads(json_match.group())
-            except json.JSONDecodeError:
+                # Tenta parse direto (caso comum com json_schema)
+                return orjson.loads(response), True
+            except orjson.JSONDecodeError:
                 pass
         
+        # Markdown/texto extra: recorta o primeiro objeto balanceado (aceita aninhados)
+        start = response.find("{")
+        if start >= 0:
+            end = _JsonObjectScanner().feed(response[start:])
+            if end >= 0:
+                try:
+                    return orjson.loads(response[start:start + end]), True
+                except orjson.JSONDecodeError:
+                    pass
+        
         # Fallback seguro
         self.log("Failed to parse LLM JSON, using fallback", level="warning")
         return {
             "decision": "HOLD",
             "direction": None,
             "confidence": 30,
-            "reasoning": "Erro ao processar resposta da IA"
-        }
+            "reasoning": _PARSE_ERROR_REASONING
+        }, False
     
     def _check_black_swan_veto(self, macro: dict[str, Any]) -> tuple[bool, str | None]:
         """
@@ -142,52 +375,154 @@ Retorne EXCLUSIVAMENTE este JSON (sem markdown):
         Returns:
             (should_veto, reason)
         """
-        alert = macro.get("alert", "LOW_RISK")
-        high_impact = macro.get("high_impact_events", 0)
-        
-        # Veto apenas para EXTREME_RISK com eventos iminentes
-        if alert == "EXTREME_RISK":
-            return True, f"BLACK SWAN: Risco extremo detectado. {high_impact} evento(s) de alto impacto iminente(s)."
-        
-        # HIGH_RISK com eventos próximos também é veto
-        if alert == "HIGH_RISK" and high_impact > 0:
-            return True, f"VETO MACRO: {high_impact} evento(s) de alto impacto nos próximos 30 min."
-        
-        return False, None
+        return _black_swan_verdict(
+            macro.get("alert", "LOW_RISK"),
+            macro.get("high_impact_events") or 0
+        )
     
     def _get_market_bias(self, direction: str | None) -> str:
         """
         Determina o viés do mercado baseado na direção.
         """
-        if direction == "BUY":
-            return "Alta"
-        elif direction == "SELL":
-            return "Baixa"
-        return "Lateralizado"
+        return _BIAS_MAP.get(direction, "Lateralizado")
     
-    def _calculate_entry_window(self, base_timestamp: datetime | None = None) -> dict[str, Any]:
+    def _calculate_entry_window(self, base_timestamp: datetime) -> dict[str, Any]:
         """
         Calcula a janela de entrada recomendada (3-5 minutos após análise).
-        """
-        base = base_timestamp or datetime.now()
         
-        start_time = base + timedelta(minutes=self.ENTRY_WINDOW_START_MINUTES)
-        end_time = base + timedelta(minutes=self.ENTRY_WINDOW_END_MINUTES)
+        base_timestamp é o `now` do veredito: janela e timestamp no mesmo relógio.
+        """
+        start_time = base_timestamp + self._ENTRY_START_DELTA
+        end_time = base_timestamp + self._ENTRY_END_DELTA
         
+        # HH:MM via f-string: evita o strftime (locale) a cada análise
         return {
-            "start": start_time.strftime("%H:%M"),
-            "end": end_time.strftime("%H:%M"),
+            "start": f"{start_time.hour:02d}:{start_time.minute:02d}",
+            "end": f"{end_time.hour:02d}:{end_time.minute:02d}",
             "start_iso": start_time.isoformat(),
             "end_iso": end_time.isoformat(),
-            "instruction": "Aguardar confirmação de volume no horário sugerido"
+            "instruction": _ENTRY_INSTRUCTION
         }
     
-    async def analyze(self, market_state: dict[str, Any]) -> dict[str, Any]:
+    async def _ask_cio(self, cio_prompt: str, cio_key: str) -> tuple[str, bool]:
+        """
+        Resposta bruta do CIO para o prompt, servida do _CIO_CACHE quando possível.
+        
+        Returns:
+            (conteúdo, veio_do_cache)
+        """
+        cached_response = _CIO_CACHE.get(cio_key)
+        if cached_response is not None:
+            self.log("CIO response served from cache", _CIO_CACHE.stats())
+            return cached_response, True
+        
+        try:
+            content = await self._stream_cio(cio_prompt, _CIO_RESPONSE_FORMAT)
+        except httpx.HTTPStatusError as e:
+            # Provedor/modelo que recusa json_schema: repete com saída livre
+            if e.response.status_code not in (400, 422):
+                raise
+            self.log("Structured output rejected, retrying without json_schema", level="warning")
+            content = await self._stream_cio(cio_prompt, None)
+        return content, False
+    
+    async def _stream_cio(self, cio_prompt: str, response_format: dict[str, Any] | None) -> str:
+        """
+        Chama o CIO em streaming e para de ler quando o objeto JSON fecha.
+        
+        Texto que o modelo emitir depois do veredito (cercas de markdown,
+        comentários) não é esperado: o stream é fechado e o provedor para
+        de gerar.
+        """
+        parts: list[str] = []
+        scanner = _JsonObjectScanner()
+        stream = self._llm.stream_chat(
+            system_prompt=_CIO_SYSTEM_PREFIX,
+            user_message=cio_prompt,
+            temperature=0.3,  # Levemente criativo para reasoning
+            prompt_cache_key=_CIO_PROMPT_CACHE_KEY,
+            response_format=response_format
+        )
+        async with aclosing(stream):
+            async for delta in stream:
+                end = scanner.feed(delta)
+                if end >= 0:
+                    parts.append(delta[:end])
+                    break
+                parts.append(delta)
+        return "".join(parts)
+    
+    async def _load_trade_memory(
+        self,
+        quant: dict[str, Any],
+        quant_raw: dict[str, Any],
+        now: datetime
+    ) -> dict[str, Any]:
+        """
+        Busca padrões históricos (Trade Memory) para a seção do prompt do CIO.
+        Nunca levanta: em falha devolve uma seção neutra.
+        """
+        try:
+            memory_insights = await trade_memory.analyze_patterns(days=30)
+            
+            # Verifica se deve pular trade baseado no histórico
+            current_hour = now.hour
+            mtf_aligned = quant_raw.get("mtf_confluence_direction") == quant.get("signal")
+            volatility = quant_raw.get("volatility", "NORMAL")
+            
+            should_skip, skip_reason = trade_memory.should_skip_trade(
+                insights=memory_insights,
+                current_hour=current_hour,
+                volatility=volatility,
+                mtf_aligned=mtf_aligned
+            )
+            
+            if should_skip:
+                self.log(f"Trade Memory VETO: {skip_reason}", level="warning")
+            
+            # Ajuste de confiança baseado no histórico
+            memory_adjustment = trade_memory.get_confidence_adjustment(memory_insights, mtf_aligned)
+            
+            memory = {
+                "insights": trade_memory.format_insights_for_prompt(memory_insights),
+                "should_skip": should_skip,
+                "skip_reason": skip_reason if should_skip else None,
+                "confidence_adjustment": memory_adjustment,
+                "historical_win_rate": memory_insights.win_rate,
+                "profit_factor": memory_insights.profit_factor,
+                "sample_size": memory_insights.total_trades,
+                "recommendations": memory_insights.recommendations[:3],
+                "avoid_conditions": memory_insights.avoid_conditions[:2]
+            }
+            
+            if self.log_enabled():
+                self.log("Trade Memory insights loaded", {
+                    "historical_win_rate": f"{memory_insights.win_rate:.1f}%",
+                    "sample_size": memory_insights.total_trades,
+                    "confidence_adjustment": memory_adjustment
+                })
+            
+            return memory
+        
+        except Exception as e:
+            self.log(f"Trade Memory analysis failed: {e}", level="warning")
+            return {
+                "insights": "Trade Memory unavailable",
+                "should_skip": False,
+                "confidence_adjustment": 0
+            }
+    
+    async def analyze(self, market_state: dict[str, Any]) -> RiskDecision:
         """
         DECISÃO FINAL via LLM-FIRST ARCHITECTURE.
         A IA tem SOBERANIA TOTAL sobre a decisão.
+        
+        Exceção: o veto Black Swan é final por política. Nesse caso o CIO
+        (LLM) e o Trade Memory não são consultados e llm_validation sai
+        marcado como "skipped".
         """
         self.log("CIO analyzing market data (LLM-First Architecture)")
+        now = datetime.now()  # Único relógio do veredito (hora, janela e timestamp)
         
         # ============== EXTRAÇÃO DE DADOS BRUTOS ==============
         quant = market_state.get("quant_analysis", {})
@@ -202,6 +537,12 @@ Retorne EXCLUSIVAMENTE este JSON (sem markdown):
         # Dados de sentimento
         sentiment_raw = sentiment.get("raw_data", {})
         
+        # Campos lidos em vários pontos (prompt, inputs, supabase): extraídos uma vez.
+        # Tokens do alfabeto fixo internados: comparações/lookups por ponteiro
+        quant_signal = sys.intern(quant.get("signal", "NEUTRAL"))
+        sentiment_score = sentiment_raw.get("score", 0)
+        macro_alert = sys.intern(macro.get("alert", "LOW_RISK"))
+        
         # ============== CHECK BLACK SWAN VETO ==============
         should_veto, veto_reason = self._check_black_swan_veto(macro)
         
@@ -213,14 +554,15 @@ Retorne EXCLUSIVAMENTE este JSON (sem markdown):
                 reason=veto_reason,
                 macro=macro,
                 quant=quant,
-                sentiment_raw=sentiment_raw
+                sentiment_raw=sentiment_raw,
+                now=now
             )
         
         # ============== MONTAR DADOS PARA O CIO ==============
         raw_data = {
             "pair": pair,
             "quant_analyst": {
-                "signal": quant.get("signal", "NEUTRAL"),
+                "signal": quant_signal,
                 "trend": quant_raw.get("trend", "NEUTRAL"),
                 "trend_score": quant_raw.get("trend_score", 0),
                 "rsi": quant_raw.get("rsi", 50),
@@ -249,17 +591,19 @@ Retorne EXCLUSIVAMENTE este JSON (sem markdown):
                         "rsi": data.get("rsi")
                     }
                     for tf, data in quant_raw.get("mtf_timeframes", {}).items()
-                    if isinstance(data, dict)
+                    # NEUTRAL já está resumido em confluence_*
+                    if isinstance(data, dict) and data.get("signal") != "NEUTRAL"
                 }
             },
             "sentiment_pulse": {
-                "score": sentiment_raw.get("score", 0),
+                "score": sentiment_score,
                 "label": sentiment_raw.get("label", "NEUTRAL"),
                 "articles_analyzed": sentiment_raw.get("articles_analyzed", 0),
-                "headlines": sentiment_raw.get("headlines", [])[:5]  # Top 5 headlines
+                # Top 5 headlines, cortadas em _HEADLINE_MAX
+                "headlines": [h[:_HEADLINE_MAX] for h in sentiment_raw.get("headlines", [])[:5]]
             },
             "macro_watcher": {
-                "alert": macro.get("alert", "LOW_RISK"),
+                "alert": macro_alert,
                 "high_impact_events": macro.get("high_impact_events", 0),
                 "message": macro.get("message", ""),
                 "should_trade": macro.get("should_trade", True)
@@ -268,76 +612,52 @@ Retorne EXCLUSIVAMENTE este JSON (sem markdown):
         
         # ============== TRADE MEMORY INSIGHTS ==============
         # Busca padrões históricos para melhorar decisões
-        try:
-            memory_insights = await trade_memory.analyze_patterns(days=30)
-            
-            # Verifica se deve pular trade baseado no histórico
-            current_hour = datetime.now().hour
-            mtf_aligned = quant_raw.get("mtf_confluence_direction") == quant.get("signal")
-            volatility = quant_raw.get("volatility", "NORMAL")
-            
-            should_skip, skip_reason = trade_memory.should_skip_trade(
-                insights=memory_insights,
-                current_hour=current_hour,
-                volatility=volatility,
-                mtf_aligned=mtf_aligned
-            )
-            
-            if should_skip:
-                self.log(f"Trade Memory VETO: {skip_reason}", level="warning")
-            
-            # Ajuste de confiança baseado no histórico
-            memory_adjustment = trade_memory.get_confidence_adjustment(memory_insights, mtf_aligned)
-            
-            raw_data["trade_memory"] = {
-                "insights": trade_memory.format_insights_for_prompt(memory_insights),
-                "should_skip": should_skip,
-                "skip_reason": skip_reason if should_skip else None,
-                "confidence_adjustment": memory_adjustment,
-                "historical_win_rate": memory_insights.win_rate,
-                "profit_factor": memory_insights.profit_factor,
-                "sample_size": memory_insights.total_trades,
-                "recommendations": memory_insights.recommendations[:3],
-                "avoid_conditions": memory_insights.avoid_conditions[:2]
-            }
-            
-            self.log("Trade Memory insights loaded", {
-                "historical_win_rate": f"{memory_insights.win_rate:.1f}%",
-                "sample_size": memory_insights.total_trades,
-                "confidence_adjustment": memory_adjustment
-            })
-            
-        except Exception as e:
-            self.log(f"Trade Memory analysis failed: {e}", level="warning")
-            raw_data["trade_memory"] = {
-                "insights": "Trade Memory unavailable",
-                "should_skip": False,
-                "confidence_adjustment": 0
-            }
+        raw_data["trade_memory"] = await self._load_trade_memory(quant, quant_raw, now)
         
         # ============== CHAMADA LLM (CIO DECIDE) ==============
-        self.log("Invoking CIO for final decision")
-        
+        # _CIO_CACHE chaveia no prompt inteiro (preço incluso): TP/SL nunca
+        # são reaproveitados de um preço anterior
         cio_prompt = self._build_cio_prompt(raw_data)
+        self.log("Invoking CIO for final decision", {"prompt_chars": len(cio_prompt)})
+        cio_key = AICache.key(_CIO_SYSTEM_PREFIX, cio_prompt)
+        llm_task = asyncio.create_task(self._ask_cio(cio_prompt, cio_key))
+        
+        # Enquanto o CIO responde: partes do resultado que não dependem dele
+        scheduled_entry = self._calculate_entry_window(now)
+        inputs = {
+            # Indicadores completos só em supabase_record.technical_signal
+            "technical": {"signal": quant_signal},
+            "sentiment": {
+                "score": sentiment_score,
+                "label": sentiment_raw.get("label", "NEUTRAL"),
+                "articles_analyzed": sentiment_raw.get("articles_analyzed", 0)
+            },
+            "macro": {
+                "alert": macro_alert,
+                "high_impact_events": macro.get("high_impact_events", 0),
+                "message": macro.get("message", "")
+            }
+        }
         
-        # Usar chat() diretamente para prompt customizado
         try:
-            response = await self._llm.chat(
-                system_prompt=cio_prompt,
-                user_message="Analise e tome sua decisão. Retorne APENAS o JSON.",
-                temperature=0.3  # Levemente criativo para reasoning
-            )
-            raw_response = response.content
+            raw_response, from_cache = await llm_task
+            llm_ok = True
         except Exception as e:
             self.log(f"LLM call failed: {e}", level="error")
             raw_response = '{"decision": "HOLD", "direction": null, "confidence": 30, "reasoning": "Erro na chamada LLM"}'
+            llm_ok = False
+            from_cache = False
         
         # Parse da resposta
-        cio_decision = self._parse_llm_response(raw_response)
+        cio_decision, parse_ok = self._parse_llm_response(raw_response)
         cio_decision["raw_response"] = raw_response
         
+        # Só respostas válidas do CIO entram no cache
+        if llm_ok and parse_ok and not from_cache:
+            _CIO_CACHE.put(cio_key, raw_response)
+        
         # ============== EXTRAIR DECISÃO DA IA ==============
-        decision = cio_decision.get("decision", "HOLD").upper()
+        decision = sys.intern(cio_decision.get("decision", "HOLD").upper())
         direction = cio_decision.get("direction")
         confidence = cio_decision.get("confidence", 50)
         reasoning = cio_decision.get("reasoning", "Sem explicação")
@@ -350,8 +670,6 @@ Retorne EXCLUSIVAMENTE este JSON (sem markdown):
         # ============== CONFIDENCE OVERRIDE ==============
         # REGRA: Se confidence >= 65%, DEVE ser tratado como ENTRY (não HOLD)
         # Isso garante que sinais fortes nunca sejam desperdiçados
-        quant_signal = raw_data["quant_analyst"]["signal"]
-        
         if decision == "HOLD" and confidence >= 65:
             # Alta confiança + HOLD = inconsistência da IA
             # Forçar ENTRY baseado no sinal técnico
@@ -361,52 +679,41 @@ Retorne EXCLUSIVAMENTE este JSON (sem markdown):
                 "override_action": "Forcing ENTRY due to high confidence"
             }, level="warning")
             
-            if quant_signal == "BULLISH":
-                decision = "ENTRY"
-                direction = "BUY"
-            elif quant_signal == "BEARISH":
-                decision = "ENTRY"
-                direction = "SELL"
             # Se técnico for NEUTRAL, mantém HOLD mesmo com alta confiança
+            override = _OVERRIDE_DIRECTION.get(quant_signal)
+            if override is not None:
+                decision = "ENTRY"
+                direction = override
         
         # Normalizar decision para o formato do sistema
-        if decision == "ENTRY":
-            if direction == "BUY":
-                final_decision = "BUY"
-            elif direction == "SELL":
-                final_decision = "SELL"
-            else:
-                final_decision = "HOLD"
-                direction = None
-        else:
-            final_decision = "HOLD"
-            direction = None
+        final_decision, direction = _VERDICT_TABLE.get((decision, direction), _HOLD_VERDICT)
         
         # ============== LOG DO VEREDITO ==============
-        log_level = "warning" if final_decision in ["BUY", "SELL"] else "info"
-        signal_strength = "FORTE" if confidence >= 75 else "MODERADO" if confidence >= 50 else "FRACO"
-        
-        self.log("CIO VERDICT", {
-            "decision": final_decision,
-            "direction": direction,
-            "confidence": f"{confidence}%",
-            "signal_strength": signal_strength,
-            "reasoning": reasoning[:100] + "..." if len(reasoning) > 100 else reasoning
-        }, level=log_level)
+        log_level = "warning" if final_decision in _TRADE_DECISIONS else "info"
+        signal_strength = _STRENGTH_LABELS[bisect_right(_STRENGTH_THRESHOLDS, confidence)]
+        
+        # HOLD loga em info: só formata o payload se o nível estiver habilitado
+        if self.log_enabled(log_level):
+            self.log("CIO VERDICT", {
+                "decision": final_decision,
+                "direction": direction,
+                "confidence": f"{confidence}%",
+                "signal_strength": signal_strength,
+                "reasoning": reasoning[:100] + "..." if len(reasoning) > 100 else reasoning
+            }, level=log_level)
         
         # ============== RESULT FINAL ==============
         market_bias = self._get_market_bias(direction)
-        scheduled_entry = self._calculate_entry_window()
         
         exit_levels = {
             "entry_price": entry_price,
             "take_profit": take_profit,
             "stop_loss": stop_loss,
-            "exit_condition": f"TP: {take_profit:.5f} | SL: {stop_loss:.5f}" if take_profit and stop_loss else "Não definido",
-            "risk_reward_ratio": round((take_profit - entry_price) / (entry_price - stop_loss), 2) if stop_loss and take_profit and entry_price != stop_loss else 0
+            "exit_condition": _EXIT_CONDITION(take_profit, stop_loss) if take_profit and stop_loss else "Não definido",
+            "risk_reward_ratio": _risk_reward(entry_price, take_profit, stop_loss)
         }
         
-        result = {
+        result: RiskDecision = {
             "agent": self.name,
             "decision": final_decision,
             "direction": direction,
@@ -414,39 +721,24 @@ Retorne EXCLUSIVAMENTE este JSON (sem markdown):
             "reasoning": reasoning,
             "signal_strength": signal_strength,
             "llm_validation": cio_decision,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             
             # Professional Execution Strategy
             "market_bias": market_bias,
             "scheduled_entry": scheduled_entry,
             "exit_levels": exit_levels,
             
-            "inputs": {
-                "technical": {
-                    "signal": quant.get("signal", "NEUTRAL"),
-                    "raw": quant_raw
-                },
-                "sentiment": {
-                    "score": sentiment_raw.get("score", 0),
-                    "label": sentiment_raw.get("label", "NEUTRAL"),
-                    "articles_analyzed": sentiment_raw.get("articles_analyzed", 0)
-                },
-                "macro": {
-                    "alert": macro.get("alert", "LOW_RISK"),
-                    "high_impact_events": macro.get("high_impact_events", 0),
-                    "message": macro.get("message", "")
-                }
-            },
+            "inputs": inputs,
             
             # Campos para Supabase
             "supabase_record": {
                 "pair": pair,
                 "technical_signal": {
-                    "direction": quant.get("signal", "NEUTRAL"),
+                    "direction": quant_signal,
                     "indicators": quant_raw
                 },
-                "sentiment_score": sentiment_raw.get("score", 0),
-                "macro_alert": macro.get("alert", "LOW_RISK"),
+                "sentiment_score": sentiment_score,
+                "macro_alert": macro_alert,
                 "final_decision": f"{final_decision}_{direction}" if direction else final_decision,
                 "reasoning": reasoning,
                 "market_bias": market_bias,
@@ -457,14 +749,49 @@ Retorne EXCLUSIVAMENTE este JSON (sem markdown):
         
         return result
     
+    async def analyze_batch(self, states: list[dict[str, Any]]) -> list[RiskDecision]:
+        """
+        Decide vários pares de uma vez (mesma ordem de `states`).
+        
+        O veto Black Swan passa pela mesma regra de analyze
+        (_check_black_swan_veto); os estados vetados saem sem CIO e os
+        demais seguem para o CIO (analyze) em paralelo.
+        """
+        results: list[RiskDecision | None] = [None] * len(states)
+        pending: list[int] = []
+        now = datetime.now()
+        for i, state in enumerate(states):
+            macro = state.get("macro_analysis", {})
+            should_veto, veto_reason = self._check_black_swan_veto(macro)
+            if not should_veto:
+                pending.append(i)
+                continue
+            self.log("BLACK SWAN VETO TRIGGERED", {"reason": veto_reason}, level="warning")
+            results[i] = self._build_veto_result(
+                pair=state.get("pair", "EUR/USD"),
+                reason=veto_reason,
+                macro=macro,
+                quant=state.get("quant_analysis", {}),
+                sentiment_raw=state.get("sentiment_analysis", {}).get("raw_data", {}),
+                now=now
+            )
+        
+        decided = await asyncio.gather(*(self.analyze(states[i]) for i in pending))
+        for i, result in zip(pending, decided):
+            results[i] = result
+        
+        # Cada posição foi preenchida pelo veto ou pelo CIO
+        return cast(list[RiskDecision], results)
+    
     def _build_veto_result(
         self, 
         pair: str, 
         reason: str, 
         macro: dict, 
         quant: dict,
-        sentiment_raw: dict
-    ) -> dict[str, Any]:
+        sentiment_raw: dict,
+        now: datetime
+    ) -> RiskDecision:
         """
         Constrói resultado de VETO para Black Swan events.
         """
@@ -475,8 +802,8 @@ Retorne EXCLUSIVAMENTE este JSON (sem markdown):
             "confidence": 100,  # 100% certeza do veto
             "reasoning": reason,
             "signal_strength": "VETO",
-            "llm_validation": {"vetoed": True, "reason": reason},
-            "timestamp": datetime.now().isoformat(),
+            "llm_validation": {"vetoed": True, "skipped": True, "reason": reason},
+            "timestamp": now.isoformat(),
             
             "market_bias": "Lateralizado",
             "scheduled_entry": None,
@@ -488,10 +815,7 @@ Retorne EXCLUSIVAMENTE este JSON (sem markdown):
             },
             
             "inputs": {
-                "technical": {
-                    "signal": quant.get("signal", "NEUTRAL"),
-                    "raw": quant.get("raw_data", {})
-                },
+                "technical": {"signal": quant.get("signal", "NEUTRAL")},
                 "sentiment": {
                     "score": sentiment_raw.get("score", 0),
                     "label": sentiment_raw.get("label", "NEUTRAL"),
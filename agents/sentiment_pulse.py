@@ -5,32 +5,16 @@
 Consome Finnhub + Redes Sociais (Twitter, Reddit, StockTwits).
 """
 
-from typing import Any
+import asyncio
+from typing import Any, Final
 
 from agents.base import BaseAgent
 from utils.finnhub import finnhub_client
 from utils.social_sentiment import social_sentiment
 
 
-class SentimentPulseAgent(BaseAgent):
-    """
-    @Sentiment_Pulse - Especialista em Sentimento de Mercado
-    
-    Responsabilidades:
-    - Monitorar notícias de Forex via Finnhub
-    - Analisar sentimento em redes sociais (Twitter, Reddit, StockTwits)
-    - Agregar múltiplas fontes com pesos configuráveis
-    - Calcular score de -1 (Bearish) a +1 (Bullish)
-    - Identificar narrativas dominantes no mercado
-    """
-    
-    @property
-    def name(self) -> str:
-        return "@Sentiment_Pulse"
-    
-    @property
-    def role(self) -> str:
-        return """Analista de Sentimento especializado em percepção de mercado Forex.
+# Papel enviado ao LLM (prompt de sistema)
+_SENTIMENT_ROLE: Final[str] = """Analista de Sentimento especializado em percepção de mercado Forex.
         
 Você analisa MÚLTIPLAS FONTES:
 1. Notícias financeiras (Finnhub)
@@ -45,6 +29,25 @@ Seu score de sentimento varia de:
 
 IMPORTANTE: Pondere mais as fontes com mais dados. Redes sociais
 capturam o "mood" dos traders retail em tempo real."""
+
+
+class SentimentPulseAgent(BaseAgent):
+    """
+    @Sentiment_Pulse - Especialista em Sentimento de Mercado
+    
+    Responsabilidades:
+    - Monitorar notícias de Forex via Finnhub
+    - Analisar sentimento em redes sociais (Twitter, Reddit, StockTwits)
+    - Agregar múltiplas fontes com pesos configuráveis
+    - Calcular score de -1 (Bearish) a +1 (Bullish)
+    - Identificar narrativas dominantes no mercado
+    """
+    
+    model_tier = "fast"
+    
+    # Constantes de classe (sem property): lidas a cada análise/log
+    name = "@Sentiment_Pulse"
+    role = _SENTIMENT_ROLE
     
     async def analyze(self, market_state: dict[str, Any]) -> dict[str, Any]:
         """
@@ -65,13 +68,23 @@ capturam o "mood" dos traders retail em tempo real."""
         """
         self.log("Starting multi-source sentiment analysis")
         
-        # ==================== FINNHUB NEWS ====================
-        self.log("Fetching Finnhub news sentiment")
-        news_sentiment = await finnhub_client.get_news_sentiment(symbol="EUR")
+        # ============= FINNHUB NEWS + SOCIAL MEDIA (em paralelo) =============
+        self.log("Fetching Finnhub news and social media sentiment")
+        news_sentiment, social_data = await asyncio.gather(
+            finnhub_client.get_news_sentiment(symbol="EUR"),
+            social_sentiment.get_aggregated_sentiment(),
+            return_exceptions=True
+        )
         
-        # ==================== SOCIAL MEDIA ====================
-        self.log("Fetching social media sentiment")
-        social_data = await social_sentiment.get_aggregated_sentiment()
+        # Falha parcial: a fonte que caiu entra vazia (as duas fora = erro da análise)
+        if isinstance(news_sentiment, Exception) and isinstance(social_data, Exception):
+            raise news_sentiment
+        if isinstance(news_sentiment, Exception):
+            self.log(f"Finnhub news sentiment failed: {news_sentiment}", level="warning")
+            news_sentiment = {"score": 0, "articles_analyzed": 0}
+        if isinstance(social_data, Exception):
+            self.log(f"Social media sentiment failed: {social_data}", level="warning")
+            social_data = {"aggregated_score": 0, "sources_available": [], "total_posts_analyzed": 0}
         
         # ==================== AGREGAÇÃO FINAL ====================
         # Pesos: News 40%, Social 60%
@@ -98,35 +111,35 @@ capturam o "mood" dos traders retail em tempo real."""
         total_articles = news_sentiment.get("articles_analyzed", 0)
         total_posts = social_data.get("total_posts_analyzed", 0)
         
-        self.log("Multi-source data aggregated", {
-            "news_score": news_score,
-            "social_score": social_score,
-            "final_score": round(final_score, 2),
-            "label": label,
-            "articles": total_articles,
-            "posts": total_posts
-        })
+        if self.log_enabled():
+            self.log("Multi-source data aggregated", {
+                "news_score": news_score,
+                "social_score": social_score,
+                "final_score": round(final_score, 2),
+                "label": label,
+                "articles": total_articles,
+                "posts": total_posts
+            })
         
         # ==================== LLM DEEP ANALYSIS ====================
         # Se houver dados suficientes, usa LLM para análise profunda
         if total_articles >= 3 or total_posts >= 10:
-            llm_input = {
-                "news_sentiment": {
+            llm_analysis = await self.reason(
+                news_sentiment={
                     "score": news_score,
                     "headlines": news_sentiment.get("recent_headlines", [])[:5],
                     "bullish_signals": news_sentiment.get("bullish_signals", 0),
                     "bearish_signals": news_sentiment.get("bearish_signals", 0)
                 },
-                "social_sentiment": {
+                social_sentiment={
                     "score": social_score,
                     "sources": social_data.get("sources_available", []),
                     "total_posts": total_posts,
                     "reddit": social_data.get("sources_breakdown", {}).get("reddit", {}),
                     "stocktwits": social_data.get("sources_breakdown", {}).get("stocktwits", {})
                 },
-                "final_score": final_score
-            }
-            llm_analysis = await self.reason(llm_input)
+                final_score=final_score
+            )
         else:
             llm_analysis = {
                 "signal": label,
@@ -181,11 +194,12 @@ capturam o "mood" dos traders retail em tempo real."""
             "llm_analysis": llm_analysis
         }
         
-        self.log("Analysis complete", {
-            "final_score": result["sentiment_score"],
-            "signal": result["signal"],
-            "sources": social_data.get("sources_available", [])
-        })
+        if self.log_enabled():
+            self.log("Analysis complete", {
+                "final_score": result["sentiment_score"],
+                "signal": result["signal"],
+                "sources": social_data.get("sources_available", [])
+            })
         
         return result
 
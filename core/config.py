@@ -42,6 +42,7 @@ class Settings(BaseSettings):
     # Trading Configuration
     trading_pair: str = Field(default="EUR/USD", description="Par de moedas para análise")
     analysis_interval_minutes: int = Field(default=5, ge=1, le=60, description="Intervalo de análise em minutos")
+    agent_concurrency: int = Field(default=5, ge=1, le=32, description="Máximo de agentes analisando em paralelo")
     
     # Logging
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = Field(default="INFO")
@@ -51,6 +52,16 @@ class Settings(BaseSettings):
         default="anthropic/claude-3.5-sonnet",
         description="Modelo LLM via OpenRouter"
     )
+    llm_fast_model: str = Field(
+        default="openai/gpt-4o-mini",
+        description="Modelo rápido/barato para agentes com model_tier='fast'"
+    )
+    llm_model_refresh_seconds: int = Field(
+        default=60,
+        ge=0,
+        le=3600,
+        description="Tempo de cache do active_model lido do Supabase (0 = consulta a cada chamada)"
+    )
     llm_temperature: float = Field(default=0.3, ge=0, le=1)
     llm_max_tokens: int = Field(default=2048, ge=256, le=8192)
     
@@ -6,10 +6,16 @@ Gerencia comunicação com o LLM para raciocínio dos agentes.
 Suporta modelo dinâmico via Supabase system_settings.
 """
 
-from typing import Any
+import re
+import time
+from collections.abc import AsyncIterator, Callable
+from string import Template
+from typing import Annotated, Any, Literal
 
 import httpx
-from pydantic import BaseModel
+import orjson
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from pydantic.dataclasses import dataclass
 
 from core.config import settings
 from utils.logger import log_agent_action
@@ -23,6 +29,76 @@ class LLMResponse(BaseModel):
     finish_reason: str = "unknown"  # Default para APIs que retornam None
 
 
+Signal = Literal["BULLISH", "BEARISH", "NEUTRAL"]
+
+
+@dataclass(frozen=True, slots=True)
+class AgentSignal:
+    """Sinal padrão emitido por um agente (validado direto do JSON do LLM)."""
+    signal: Signal
+    confidence_score: Annotated[int, Field(ge=0, le=100)]
+    analysis: str
+    key_factors: list[str]
+
+
+# Serialização dos dados de mercado para o prompt (numpy e chaves não-str nativos)
+_DUMPS = orjson.dumps
+_DUMPS_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _dumps(data: Any, indent: bool = False) -> str:
+    """Serializa dados de mercado para texto JSON do prompt."""
+    option = _DUMPS_OPTS | orjson.OPT_INDENT_2 if indent else _DUMPS_OPTS
+    return _DUMPS(data, option=option, default=str).decode()
+
+
+# Campos resolvidos cedo durante o streaming (sinal parcial para on_partial)
+_PARTIAL_SIGNAL_RE = re.compile(r'"signal"\s*:\s*"(BULLISH|BEARISH|NEUTRAL)"')
+_PARTIAL_CONFIDENCE_RE = re.compile(r'"confidence_score"\s*:\s*(\d+)\s*[,}\n]')
+
+# Validadores reutilizados (construídos uma vez no import)
+_SIGNAL_ADAPTER = TypeAdapter(AgentSignal)
+
+
+# Prompt de sistema dos agentes: só nome e papel variam, então é renderizado
+# uma vez por agente (build_agent_system_prompt) e reutilizado a cada chamada
+_AGENT_SYSTEM_TEMPLATE = Template("""Você é $agent_name, um agente especializado no sistema 3V Engine.
+
+Seu papel: $agent_role
+
+REGRAS:
+1. Seja objetivo e baseie-se apenas nos dados fornecidos
+2. Responda SEMPRE em JSON válido
+3. Inclua confidence_score de 0 a 100
+4. Justifique sua análise de forma concisa
+
+FORMATO DE RESPOSTA:
+{
+    "signal": "BULLISH" | "BEARISH" | "NEUTRAL",
+    "confidence_score": 0-100,
+    "analysis": "sua análise aqui",
+    "key_factors": ["fator1", "fator2"]
+}""")
+
+_ANALYZE_USER_PREFIX = "Analise os seguintes dados de mercado:\n\n"
+
+
+def build_agent_system_prompt(agent_name: str, agent_role: str) -> str:
+    """Renderiza o prompt de sistema de um agente (estável entre chamadas)."""
+    return _AGENT_SYSTEM_TEMPLATE.substitute(agent_name=agent_name, agent_role=agent_role)
+
+
+def _neutral_signal(analysis: str, error: str) -> dict[str, Any]:
+    """Sinal neutro de fallback quando o LLM não retorna JSON válido."""
+    return {
+        "signal": "NEUTRAL",
+        "confidence_score": 0,
+        "analysis": analysis,
+        "key_factors": [],
+        "error": error
+    }
+
+
 class LLMClient:
     """
     Cliente assíncrono para OpenRouter (Claude 3.5 Sonnet).
@@ -47,17 +123,64 @@ class LLMClient:
             "X-Title": "3V Engine - Forex Analysis"
         }
         
-        # Cache do modelo ativo (atualizado a cada chamada)
+        # Cache do modelo ativo (revalidado no Supabase a cada llm_model_refresh_seconds)
         self._cached_model: str | None = None
+        self._model_checked_at = 0.0
+        
+        # Modelos por tier (BaseAgent.model_tier). None = modelo ativo do Supabase
+        self.models: dict[str, str | None] = {
+            "main": None,
+            "fast": settings.llm_fast_model
+        }
+        
+        # Cliente HTTP persistente: TLS uma vez por processo e HTTP/2
+        # multiplexando as chamadas concorrentes dos agentes
+        self._client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=60.0
+        )
+    
+    async def aclose(self) -> None:
+        """Fecha o pool de conexões HTTP (chamar no shutdown)."""
+        await self._client.aclose()
+    
+    async def ping(self) -> bool:
+        """
+        Aquece o cliente antes da primeira rodada, sem gastar tokens.
+        
+        Abre a conexão pooled (TLS + HTTP/2) com uma requisição leve e
+        carrega o cache do modelo ativo.
+        
+        Returns:
+            True se o OpenRouter respondeu com sucesso
+        """
+        await self._get_active_model()
+        try:
+            response = await self._client.get(f"{self._base_url}/auth/key", headers=self._headers)
+            response.raise_for_status()
+            return True
+        except httpx.HTTPError as e:
+            log_agent_action("@LLMClient", f"Warmup ping failed: {e}", level="warning")
+            return False
     
     async def _get_active_model(self) -> str:
         """
         Obtém o modelo ativo do Supabase.
         Fallback para o modelo padrão do .env se não encontrar.
         
+        O valor fica em cache por settings.llm_model_refresh_seconds, então as
+        chamadas de uma rodada não pagam um round-trip ao Supabase cada.
+        
         Returns:
             Nome do modelo a ser usado
         """
+        if (
+            self._cached_model
+            and time.monotonic() - self._model_checked_at < settings.llm_model_refresh_seconds
+        ):
+            return self._cached_model
+        
         try:
             from core.supabase_client import supabase_client
             
@@ -76,6 +199,7 @@ class LLMClient:
                         level="info"
                     )
                     self._cached_model = model
+                self._model_checked_at = time.monotonic()
                 return model or self._default_model
             
         except Exception as e:
@@ -93,7 +217,10 @@ class LLMClient:
         system_prompt: str,
         user_message: str,
         temperature: float | None = None,
-        max_tokens: int | None = None
+        max_tokens: int | None = None,
+        prompt_cache_key: str | None = None,
+        model: str | None = None,
+        response_format: dict[str, Any] | None = None
     ) -> LLMResponse:
         """
         Envia mensagem para o LLM e retorna resposta estruturada.
@@ -103,47 +230,126 @@ class LLMClient:
             user_message: Mensagem do usuário (dados para análise)
             temperature: Override da temperatura (opcional)
             max_tokens: Override do max_tokens (opcional)
+            prompt_cache_key: Chave estável do prefixo para prompt caching do provedor (opcional)
+            model: Modelo explícito (opcional, padrão = modelo ativo do Supabase)
+            response_format: Formato de saída do OpenAI/OpenRouter, ex.
+                {"type": "json_schema", ...} para decodificação restrita (opcional)
         
         Returns:
             LLMResponse com o conteúdo e metadados
         """
-        # Obtém modelo ativo (dinâmico via Supabase)
-        active_model = await self._get_active_model()
+        payload = await self._build_payload(
+            system_prompt, user_message, temperature, max_tokens, prompt_cache_key, model,
+            response_format
+        )
+        
+        response = await self._client.post(
+            f"{self._base_url}/chat/completions",
+            headers=self._headers,
+            json=payload
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        choice = data["choices"][0]
+        usage = data.get("usage", {})
+        
+        return LLMResponse(
+            content=choice["message"]["content"],
+            tokens_used=usage.get("total_tokens", 0),
+            model=data.get("model", payload["model"]),
+            finish_reason=choice.get("finish_reason") or "unknown"  # Handle None explicitly
+        )
+    
+    async def stream_chat(
+        self,
+        system_prompt: str,
+        user_message: str,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+        prompt_cache_key: str | None = None,
+        model: str | None = None,
+        response_format: dict[str, Any] | None = None
+    ) -> AsyncIterator[str]:
+        """
+        Versão em streaming de chat(): produz os trechos de texto conforme chegam (SSE).
+        
+        Mesmos argumentos de chat().
+        """
+        payload = await self._build_payload(
+            system_prompt, user_message, temperature, max_tokens, prompt_cache_key, model,
+            response_format
+        )
+        payload["stream"] = True
+        
+        async with self._client.stream(
+            "POST",
+            f"{self._base_url}/chat/completions",
+            headers=self._headers,
+            json=payload
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                # Ignora keep-alives/comentários SSE (ex: ": OPENROUTER PROCESSING")
+                if not line.startswith("data: "):
+                    continue
+                chunk = line[6:]
+                if chunk == "[DONE]":
+                    break
+                choices = orjson.loads(chunk).get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+    
+    async def _build_payload(
+        self,
+        system_prompt: str,
+        user_message: str,
+        temperature: float | None,
+        max_tokens: int | None,
+        prompt_cache_key: str | None,
+        model: str | None,
+        response_format: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Monta o payload de /chat/completions (modelo, mensagens e prompt caching)."""
+        # Obtém modelo ativo (dinâmico via Supabase) se nenhum foi pedido
+        active_model = model or await self._get_active_model()
         
+        system_message: dict[str, Any] = {"role": "system", "content": system_prompt}
         payload = {
             "model": active_model,
             "messages": [
-                {"role": "system", "content": system_prompt},
+                system_message,
                 {"role": "user", "content": user_message}
             ],
             "temperature": temperature or self._temperature,
             "max_tokens": max_tokens or self._max_tokens
         }
+        if response_format is not None:
+            payload["response_format"] = response_format
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{self._base_url}/chat/completions",
-                headers=self._headers,
-                json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
-        
-        choice = data["choices"][0]
-        usage = data.get("usage", {})
+        # Prompt caching: o prompt de sistema deve ser idêntico entre chamadas
+        if prompt_cache_key:
+            if active_model.startswith("anthropic/"):
+                system_message["content"] = [{
+                    "type": "text",
+                    "text": system_prompt,
+                    "cache_control": {"type": "ephemeral"}
+                }]
+            else:
+                payload["prompt_cache_key"] = prompt_cache_key
         
-        return LLMResponse(
-            content=choice["message"]["content"],
-            tokens_used=usage.get("total_tokens", 0),
-            model=data.get("model", active_model),
-            finish_reason=choice.get("finish_reason") or "unknown"  # Handle None explicitly
-        )
+        return payload
     
     async def analyze(
         self,
         agent_name: str,
         agent_role: str,
-        market_data: dict[str, Any]
+        market_data: dict[str, Any],
+        prompt_cache_key: str | None = None,
+        model: str | None = None,
+        on_partial: Callable[[dict[str, Any]], None] | None = None,
+        system_prompt: str | None = None
     ) -> dict[str, Any]:
         """
         Executa análise estruturada para um agente específico.
@@ -152,49 +358,58 @@ class LLMClient:
             agent_name: Nome do agente (ex: @Quant_Analyst)
             agent_role: Descrição do papel do agente
             market_data: Dados de mercado para análise
+            prompt_cache_key: Chave do prefixo (nome + papel) para prompt caching
+            model: Modelo explícito (opcional, padrão = modelo ativo do Supabase)
+            on_partial: Callback chamado uma vez, durante o streaming, assim que
+                signal e confidence_score chegam (opcional; ativa o streaming)
+            system_prompt: Prompt de sistema já renderizado por
+                build_agent_system_prompt (opcional, evita remontá-lo a cada chamada)
         
         Returns:
             Análise estruturada do agente
         """
-        system_prompt = f"""Você é {agent_name}, um agente especializado no sistema 3V Engine.
-
-Seu papel: {agent_role}
-
-REGRAS:
-1. Seja objetivo e baseie-se apenas nos dados fornecidos
-2. Responda SEMPRE em JSON válido
-3. Inclua confidence_score de 0 a 100
-4. Justifique sua análise de forma concisa
-
-FORMATO DE RESPOSTA:
-{{
-    "signal": "BULLISH" | "BEARISH" | "NEUTRAL",
-    "confidence_score": 0-100,
-    "analysis": "sua análise aqui",
-    "key_factors": ["fator1", "fator2"]
-}}"""
-
-        import json
-        user_message = f"Analise os seguintes dados de mercado:\n\n{json.dumps(market_data, indent=2)}"
+        if system_prompt is None:
+            system_prompt = build_agent_system_prompt(agent_name, agent_role)
+        user_message = _ANALYZE_USER_PREFIX + _dumps(market_data, indent=True)
         
-        response = await self.chat(
-            system_prompt=system_prompt,
-            user_message=user_message,
-            temperature=0.2  # Baixa temperatura para análise técnica
-        )
+        if on_partial is None:
+            response = await self.chat(
+                system_prompt=system_prompt,
+                user_message=user_message,
+                temperature=0.2,  # Baixa temperatura para análise técnica
+                prompt_cache_key=prompt_cache_key,
+                model=model
+            )
+            content = response.content
+        else:
+            parts: list[str] = []
+            notified = False
+            async for delta in self.stream_chat(
+                system_prompt=system_prompt,
+                user_message=user_message,
+                temperature=0.2,
+                prompt_cache_key=prompt_cache_key,
+                model=model
+            ):
+                parts.append(delta)
+                if not notified:
+                    text = "".join(parts)
+                    signal = _PARTIAL_SIGNAL_RE.search(text)
+                    confidence = _PARTIAL_CONFIDENCE_RE.search(text)
+                    if signal and confidence:
+                        notified = True
+                        on_partial({
+                            "signal": signal.group(1),
+                            "confidence_score": int(confidence.group(1))
+                        })
+            content = "".join(parts)
         
-        # Parse JSON da resposta
+        # Parse + validação JSON da resposta numa única passada
         try:
-            return json.loads(response.content)
-        except json.JSONDecodeError:
+            return _SIGNAL_ADAPTER.dump_python(_SIGNAL_ADAPTER.validate_json(content))
+        except ValidationError:
             # Fallback se o LLM não retornar JSON válido
-            return {
-                "signal": "NEUTRAL",
-                "confidence_score": 0,
-                "analysis": response.content,
-                "key_factors": [],
-                "error": "Failed to parse JSON response"
-            }
+            return _neutral_signal(content, "Failed to parse JSON response")
 
 
 # Singleton - instância única
@@ -7,10 +7,12 @@ Gerencia fluxo de análise e comunicação entre agentes.
 
 import asyncio
 from datetime import datetime
-from typing import Any, TypedDict
+from typing import Any, Final, TypedDict
 
 from langgraph.graph import StateGraph, END
 
+from agents import run_all
+from agents.base import start_tick
 from agents.quant_analyst import quant_analyst
 from agents.sentiment_pulse import sentiment_pulse
 from agents.macro_watcher import macro_watcher
@@ -31,46 +33,52 @@ class MarketState(TypedDict):
     errors: list[str]
 
 
-async def analyze_technical(state: MarketState) -> MarketState:
-    """Node: Análise técnica pelo @Quant_Analyst."""
+async def _analyze_bounded(agent, state: MarketState) -> dict[str, Any]:
+    """Executa agent.analyze() limitado a agent.TIMEOUT_S segundos."""
     try:
-        result = await quant_analyst.analyze(state)
-        state["quant_analysis"] = result
-    except Exception as e:
-        logger.error(f"@Quant_Analyst error: {e}")
-        state["errors"].append(f"Quant: {str(e)}")
-        state["quant_analysis"] = {"signal": "NEUTRAL", "confidence": 0, "error": str(e)}
-    return state
+        return await asyncio.wait_for(agent.analyze(state), timeout=agent.TIMEOUT_S)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"analysis timed out after {agent.TIMEOUT_S:.0f}s") from None
 
 
-async def analyze_sentiment(state: MarketState) -> MarketState:
-    """Node: Análise de sentimento pelo @Sentiment_Pulse."""
-    try:
-        result = await sentiment_pulse.analyze(state)
-        state["sentiment_analysis"] = result
-    except Exception as e:
-        logger.error(f"@Sentiment_Pulse error: {e}")
-        state["errors"].append(f"Sentiment: {str(e)}")
-        state["sentiment_analysis"] = {"sentiment_score": 0, "signal": "NEUTRAL", "error": str(e)}
-    return state
+# Cada analista de run_all -> (chave no MarketState, rótulo do erro, fallback).
+# O fallback completa o sinal NEUTRAL de timeout e substitui a exceção.
+_ANALYST_SLOTS: Final = (
+    (quant_analyst, "quant_analysis", "Quant", {"signal": "NEUTRAL", "confidence": 0}),
+    (sentiment_pulse, "sentiment_analysis", "Sentiment", {"sentiment_score": 0, "signal": "NEUTRAL"}),
+    (macro_watcher, "macro_analysis", "Macro", {"alert": "LOW_RISK", "should_trade": True}),
+)
 
 
-async def analyze_macro(state: MarketState) -> MarketState:
-    """Node: Análise macro pelo @Macro_Watcher."""
-    try:
-        result = await macro_watcher.analyze(state)
-        state["macro_analysis"] = result
-    except Exception as e:
-        logger.error(f"@Macro_Watcher error: {e}")
-        state["errors"].append(f"Macro: {str(e)}")
-        state["macro_analysis"] = {"alert": "LOW_RISK", "should_trade": True, "error": str(e)}
+async def analyze_market(state: MarketState) -> MarketState:
+    """
+    Node: Análises técnica, sentimento e macro em paralelo.
+    
+    Usa agents.run_all (semáforo de settings.agent_concurrency e timeout
+    por agente); exceções e timeouts viram o fallback do analista e entram
+    em state["errors"].
+    """
+    results = await run_all(state, [agent for agent, *_ in _ANALYST_SLOTS])
+    
+    for agent, key, label, fallback in _ANALYST_SLOTS:
+        result = results[agent.name]
+        if isinstance(result, BaseException):
+            logger.error(f"{agent.name} error: {result}")
+            state["errors"].append(f"{label}: {str(result)}")
+            result = {**fallback, "error": str(result)}
+        elif "error" in result:
+            # Timeout em run_all: sinal NEUTRAL já com a mensagem de erro
+            state["errors"].append(f"{label}: {result['error']}")
+            result = {**fallback, **result}
+        state[key] = result
+    
     return state
 
 
 async def make_decision(state: MarketState) -> MarketState:
     """Node: Decisão final pelo @Risk_Commander."""
     try:
-        result = await risk_commander.analyze(state)
+        result = await _analyze_bounded(risk_commander, state)
         state["final_decision"] = result
         
         decision = result.get("decision", "HOLD")
@@ -155,7 +163,7 @@ def create_orchestrator() -> StateGraph:
     Cria o grafo de orquestração dos agentes.
     
     Fluxo:
-    1. Análises paralelas: Quant + Sentiment + Macro
+    1. Análises paralelas (asyncio.gather): Quant + Sentiment + Macro
     2. Decisão final: Risk Commander
     3. Persistência: Supabase
     
@@ -166,23 +174,16 @@ def create_orchestrator() -> StateGraph:
     workflow = StateGraph(MarketState)
     
     # Adiciona nodes
-    workflow.add_node("technical", analyze_technical)
-    workflow.add_node("sentiment", analyze_sentiment)
-    workflow.add_node("macro", analyze_macro)
+    workflow.add_node("analysis", analyze_market)
     workflow.add_node("decision", make_decision)
     workflow.add_node("persist", save_to_database)
     
     # Define o fluxo
-    # Start -> Parallel analyses
-    workflow.set_entry_point("technical")
-    
-    # Technical -> Sentiment -> Macro (sequencial para demo)
-    # Em produção, pode ser paralelo com asyncio.gather
-    workflow.add_edge("technical", "sentiment")
-    workflow.add_edge("sentiment", "macro")
+    # Start -> Parallel analyses (Technical + Sentiment + Macro)
+    workflow.set_entry_point("analysis")
     
-    # Macro -> Decision
-    workflow.add_edge("macro", "decision")
+    # Analyses -> Decision
+    workflow.add_edge("analysis", "decision")
     
     # Decision -> Persist -> End
     workflow.add_edge("decision", "persist")
@@ -223,6 +224,7 @@ class Orchestrator:
         """
         logger.info(f"🔄 Starting analysis cycle for {self.pair}")
         
+        start_tick()
         initial_state = self.create_initial_state()
         final_state = await self.graph.ainvoke(initial_state)
         
@@ -25,7 +25,9 @@ from pathlib import Path
 # Adiciona o diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from agents.base import BaseAgent
 from core.config import settings
+from core.llm_client import llm_client
 from core.orchestrator import get_orchestrator
 from utils.logger import logger
 
@@ -47,7 +49,11 @@ async def run_once():
     logger.info("=" * 60)
     
     orchestrator = get_orchestrator(pair=settings.trading_pair)
-    result = await orchestrator.run_analysis()
+    try:
+        await BaseAgent.warmup()
+        result = await orchestrator.run_analysis()
+    finally:
+        await llm_client.aclose()
     
     # Exibe resultado
     decision = result.get("final_decision", {})
@@ -199,8 +205,9 @@ async def run_monitoring_loop():
         except Exception as e:
             logger.error(f"Failed to schedule entry confirmation: {e}")
     
-    # Conecta ao MT5 (modo simulação em macOS)
+    # Conecta ao MT5 (modo simulação em macOS) e mantém a conexão viva
     await execution_handler.connect()
+    execution_handler.start_keepalive()
     
     async def get_trading_config():
         """Obtém configurações de trading do Supabase."""
@@ -227,6 +234,8 @@ async def run_monitoring_loop():
             logger.warning(f"Failed to get trading config: {e}")
             return {"trading_mode": "SIGNAL_ONLY", "risk_per_trade": 1.0, "max_daily_loss": 3.0}
     
+    await BaseAgent.warmup()
+    
     try:
         while not shutdown_event.is_set():
             analysis_count += 1
@@ -346,8 +355,9 @@ async def run_monitoring_loop():
             print("   " + " " * 50, end="\r")  # Limpa linha
             
     finally:
-        execution_handler.disconnect()
+        await execution_handler.disconnect()
         orchestrator.stop()
+        await llm_client.aclose()
         logger.info("🛑 3V Engine stopped successfully")
 
 
@@ -457,10 +467,19 @@ async def force_buy():
         print(f"   Error: {result.get('error')}")
     print("=" * 60 + "\n")
     
-    execution_handler.disconnect()
+    await execution_handler.disconnect()
     return result
 
 
+def _install_uvloop() -> None:
+    """Usa o event loop do uvloop quando instalado (não disponível no Windows)."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
 def main():
     """Entry point principal."""
     parser = argparse.ArgumentParser(
@@ -511,6 +530,8 @@ Examples:
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
+    _install_uvloop()
+    
     # Executa modo selecionado
     if args.test:
         success = asyncio.run(test_connections())
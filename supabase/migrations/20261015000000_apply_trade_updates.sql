@@ -0,0 +1,32 @@
+-- 3V Engine - apply_trade_updates
+-- Atualiza vários trades do execution_log numa única chamada (supabase.rpc).
+-- O campo data é mesclado no servidor (data || patch), então o cliente envia
+-- só as chaves que mudaram em vez do JSON completo do trade.
+--
+-- updates: [{"ticket": 123, "profit": 12.5, "status": "CLOSED", "patch": {...}}, ...]
+--   profit, status e patch são opcionais (ausente = mantém o valor atual)
+-- Retorna o número de linhas atualizadas.
+
+create or replace function public.apply_trade_updates(updates jsonb)
+returns integer
+language sql
+as $$
+    with u as (
+        select
+            (item ->> 'ticket')::bigint as ticket,
+            (item ->> 'profit')::numeric as profit,
+            item ->> 'status' as status,
+            coalesce(item -> 'patch', '{}'::jsonb) as patch
+        from jsonb_array_elements(updates) as item
+    ),
+    updated as (
+        update public.execution_log as e
+           set profit = coalesce(u.profit, e.profit),
+               status = coalesce(u.status, e.status),
+               data   = coalesce(e.data, '{}'::jsonb) || u.patch
+          from u
+         where e.ticket = u.ticket
+        returning 1
+    )
+    select count(*)::integer from updated;
+$$;
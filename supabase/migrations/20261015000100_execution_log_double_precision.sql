@@ -0,0 +1,11 @@
+-- 3V Engine - execution_log: colunas numéricas como double precision
+-- Colunas numeric chegam no PostgREST/supabase-py como string/Decimal e
+-- obrigam o monitor a converter cada campo em todo ciclo. Com double
+-- precision os valores já chegam como float.
+
+alter table public.execution_log
+    alter column volume      type double precision using volume::double precision,
+    alter column entry_price type double precision using entry_price::double precision,
+    alter column stop_loss   type double precision using stop_loss::double precision,
+    alter column take_profit type double precision using take_profit::double precision,
+    alter column profit      type double precision using profit::double precision;
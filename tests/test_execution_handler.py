@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+3V Engine - Execution Handler Tests
+====================================
+Testes offline do monitor de trades do @Execution_Handler
+(sem Supabase, Twelve Data ou Telegram reais).
+
+Uso:
+    pytest tests/test_execution_handler.py -v
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+
+class _FakeQuery:
+    """Query builder falso: encadeia select/eq sem tocar a rede."""
+    
+    def table(self, *args, **kwargs):
+        return self
+    
+    def select(self, *args, **kwargs):
+        return self
+    
+    def eq(self, *args, **kwargs):
+        return self
+    
+    def execute(self):
+        raise AssertionError("execute must run through the stubbed _sb")
+
+
+def _trade(ticket: int, direction: str, entry, stop_loss, take_profit, symbol: str = "EURUSD") -> dict:
+    return {
+        "ticket": ticket,
+        "symbol": symbol,
+        "direction": direction,
+        "entry_price": entry,
+        "stop_loss": stop_loss,
+        "take_profit": take_profit,
+        "volume": 0.01
+    }
+
+
+async def _monitor(monkeypatch, rows: list[dict], prices: dict[str, float]):
+    """
+    Roda monitor_open_trades com Supabase, preço e notificação stubados.
+    
+    Returns:
+        (resumo, atualizações gravadas, fechamentos notificados)
+    """
+    from agents.execution_handler import execution_handler
+    
+    # agents/__init__ reexporta a instância com o nome do módulo
+    module = sys.modules["agents.execution_handler"]
+    
+    flushed: list[dict] = []
+    notified: list[tuple] = []
+    
+    async def fake_sb(self, fn):
+        return SimpleNamespace(data=rows)
+    
+    async def fake_price(self, symbol):
+        return prices[symbol]
+    
+    async def fake_flush(self, updates):
+        flushed.extend(updates)
+        return len(updates)
+    
+    async def fake_notify(self, trade, reason, current_price, profit, now):
+        notified.append((trade["ticket"], reason, current_price, profit))
+        return True
+    
+    handler_cls = type(execution_handler)
+    monkeypatch.setattr(module, "supabase_client", SimpleNamespace(client=_FakeQuery()))
+    monkeypatch.setattr(handler_cls, "_sb", fake_sb)
+    monkeypatch.setattr(handler_cls, "_get_current_price", fake_price)
+    monkeypatch.setattr(handler_cls, "_flush_trade_updates", fake_flush)
+    monkeypatch.setattr(handler_cls, "_notify_trade_closed", fake_notify)
+    
+    summary = await execution_handler.monitor_open_trades()
+    return summary, flushed, notified
+
+
+class TestMonitorOpenTrades:
+    """P&L e TP/SL calculados em lote, gravados numa única RPC."""
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("direction,entry,stop_loss,take_profit,price,reason,exit_price,profit", [
+        ("LONG", 1.1000, 1.0980, 1.1020, 1.1025, "TAKE_PROFIT", 1.1020, 2.0),
+        ("LONG", 1.1000, 1.0980, 1.1020, 1.0975, "STOP_LOSS", 1.0980, -2.0),
+        ("SHORT", 1.1000, 1.1020, 1.0980, 1.0975, "TAKE_PROFIT", 1.0980, 2.0),
+        ("SHORT", 1.1000, 1.1020, 1.0980, 1.1025, "STOP_LOSS", 1.1020, -2.0),
+    ])
+    async def test_close_on_tp_or_sl(
+        self, monkeypatch, direction, entry, stop_loss, take_profit, price, reason, exit_price, profit
+    ):
+        """Trade que toca TP/SL fecha no preço exato do nível, não no preço atual."""
+        rows = [_trade(1, direction, entry, stop_loss, take_profit)]
+        
+        summary, flushed, notified = await _monitor(monkeypatch, rows, {"EURUSD": price})
+        
+        assert summary == {"trades_monitored": 1, "trades_updated": 0, "trades_closed": 1}
+        assert len(flushed) == 1
+        assert flushed[0]["ticket"] == 1
+        assert flushed[0]["status"] == "CLOSED"
+        assert flushed[0]["profit"] == pytest.approx(profit)
+        assert flushed[0]["patch"]["close_reason"] == reason
+        assert flushed[0]["patch"]["exit_price"] == pytest.approx(exit_price)
+        assert notified == [(1, reason, pytest.approx(exit_price), pytest.approx(profit))]
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("direction,stop_loss,take_profit,price,profit", [
+        ("LONG", 1.0980, 1.1020, 1.1010, 1.0),
+        ("SHORT", 1.1020, 1.0980, 1.0990, 1.0),
+    ])
+    async def test_open_trade_only_updates_profit(
+        self, monkeypatch, direction, stop_loss, take_profit, price, profit
+    ):
+        """Sem TP/SL atingido: só profit, current_price e last_update."""
+        rows = [_trade(1, direction, 1.1000, stop_loss, take_profit)]
+        
+        summary, flushed, notified = await _monitor(monkeypatch, rows, {"EURUSD": price})
+        
+        assert summary == {"trades_monitored": 1, "trades_updated": 1, "trades_closed": 0}
+        assert notified == []
+        assert len(flushed) == 1
+        assert "status" not in flushed[0]
+        assert flushed[0]["profit"] == pytest.approx(profit)
+        assert flushed[0]["patch"]["current_price"] == pytest.approx(price)
+        assert set(flushed[0]["patch"]) == {"current_price", "last_update"}
+    
+    @pytest.mark.asyncio
+    async def test_take_profit_wins_when_both_hit(self, monkeypatch):
+        """Níveis cruzados (TP e SL atingidos no mesmo preço): TP tem prioridade."""
+        rows = [_trade(1, "LONG", 1.1000, 1.1010, 1.0990)]
+        
+        summary, flushed, notified = await _monitor(monkeypatch, rows, {"EURUSD": 1.1000})
+        
+        assert summary["trades_closed"] == 1
+        assert flushed[0]["patch"]["close_reason"] == "TAKE_PROFIT"
+        assert flushed[0]["patch"]["exit_price"] == pytest.approx(1.0990)
+        assert flushed[0]["profit"] == pytest.approx(-1.0)
+        assert notified[0][1] == "TAKE_PROFIT"
+    
+    @pytest.mark.asyncio
+    async def test_invalid_row_is_skipped(self, monkeypatch):
+        """Linha com coluna não numérica é pulada; as demais seguem no ciclo."""
+        rows = [
+            _trade(1, "LONG", 1.1000, 1.0980, 1.1020),
+            _trade(2, "LONG", "n/a", 1.0980, 1.1020),
+            _trade(3, "SHORT", 1.1000, 1.1020, 1.0980, symbol="GBPUSD"),
+        ]
+        
+        summary, flushed, notified = await _monitor(
+            monkeypatch, rows, {"EURUSD": 1.1025, "GBPUSD": 1.0990}
+        )
+        
+        assert summary == {"trades_monitored": 3, "trades_updated": 1, "trades_closed": 1}
+        assert sorted(update["ticket"] for update in flushed) == [1, 3]
+        assert [ticket for ticket, *_ in notified] == [1]
+    
+    @pytest.mark.asyncio
+    async def test_no_open_trades(self, monkeypatch):
+        """Nenhum trade OPEN: nada é gravado nem notificado."""
+        summary, flushed, notified = await _monitor(monkeypatch, [], {})
+        
+        assert summary == {"trades_monitored": 0, "message": "No open trades"}
+        assert flushed == []
+        assert notified == []
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+3V Engine - Risk Commander Tests
+=================================
+Testes offline do @Risk_Commander (sem chamadas reais ao LLM).
+
+Uso:
+    pytest tests/test_risk_commander.py -v
+"""
+
+import sys
+from pathlib import Path
+
+# Adiciona diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+
+class _ForbiddenLLM:
+    """LLM falso: qualquer chamada reprova o teste."""
+    
+    async def chat(self, *args, **kwargs):
+        raise AssertionError("CIO LLM must not be called on VETO")
+    
+    async def stream_chat(self, *args, **kwargs):
+        raise AssertionError("CIO LLM must not be called on VETO")
+        yield  # torna o método um async generator, como o do LLMClient
+
+
+def _market_state(alert: str, high_impact_events: int) -> dict:
+    return {
+        "pair": "EUR/USD",
+        "quant_analysis": {"signal": "BULLISH", "raw_data": {"price": 1.085}},
+        "sentiment_analysis": {"raw_data": {"score": 0.6, "label": "BULLISH"}},
+        "macro_analysis": {
+            "alert": alert,
+            "high_impact_events": high_impact_events,
+            "message": "NFP em 10 minutos"
+        }
+    }
+
+
+class TestBlackSwanVeto:
+    """O veto macro é final: nenhuma chamada ao LLM."""
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("alert,events", [("EXTREME_RISK", 2), ("HIGH_RISK", 1)])
+    async def test_veto_skips_llm(self, monkeypatch, alert, events):
+        """VETO retorna HOLD sem consultar o CIO."""
+        from agents.risk_commander import risk_commander
+        
+        monkeypatch.setattr(risk_commander, "_llm", _ForbiddenLLM())
+        
+        result = await risk_commander.analyze(_market_state(alert, events))
+        
+        assert result["decision"] == "HOLD"
+        assert result["signal_strength"] == "VETO"
+        assert result["llm_validation"]["skipped"] is True
+        assert result["supabase_record"]["final_decision"] == "VETO_MACRO"
+    
+    @pytest.mark.asyncio
+    async def test_batch_veto_skips_llm(self, monkeypatch):
+        """analyze_batch veta em bloco sem consultar o CIO."""
+        from agents.risk_commander import risk_commander
+        
+        monkeypatch.setattr(risk_commander, "_llm", _ForbiddenLLM())
+        
+        results = await risk_commander.analyze_batch([
+            _market_state("EXTREME_RISK", 2),
+            _market_state("HIGH_RISK", 1),
+        ])
+        
+        assert [r["signal_strength"] for r in results] == ["VETO", "VETO"]
+        assert all(r["llm_validation"]["skipped"] for r in results)
+
+
+class _ChunkedLLM:
+    """LLM falso: devolve a resposta do CIO em pedaços, como o stream_chat."""
+    
+    def __init__(self, chunks: list[str]) -> None:
+        self.chunks = chunks
+        self.consumed = 0
+        self.closed = False
+    
+    async def stream_chat(self, *args, **kwargs):
+        try:
+            for chunk in self.chunks:
+                self.consumed += 1
+                yield chunk
+        finally:
+            self.closed = True
+
+
+class TestJsonObjectScanner:
+    """Fechamento do objeto de topo no texto em streaming."""
+    
+    def _scan(self, chunks: list[str]) -> str | None:
+        """Texto consumido até a '}' de fechamento (None se não fechou)."""
+        from agents.risk_commander import _JsonObjectScanner
+        
+        scanner = _JsonObjectScanner()
+        parts = []
+        for chunk in chunks:
+            end = scanner.feed(chunk)
+            if end >= 0:
+                parts.append(chunk[:end])
+                return "".join(parts)
+            parts.append(chunk)
+        return None
+    
+    def test_nested_objects(self):
+        text = '{"decision": "ENTRY", "meta": {"a": {"b": 1}}}'
+        assert self._scan([text + " fim"]) == text
+    
+    def test_braces_inside_strings(self):
+        text = '{"reasoning": "suporte {1.0850} rompido }}"}'
+        assert self._scan([text]) == text
+    
+    def test_escaped_quotes(self):
+        text = '{"reasoning": "o \\"NFP\\" saiu } forte", "confidence": 70}'
+        assert self._scan([text]) == text
+    
+    def test_escaped_backslash_before_quote(self):
+        text = '{"path": "C:\\\\", "x": "}"}'
+        assert self._scan([text]) == text
+    
+    def test_closing_brace_split_across_chunks(self):
+        text = '{"decision": "HOLD", "meta": {"x": 1}}'
+        chunks = [text[i:i + 3] for i in range(0, len(text), 3)] + ["\n```"]
+        assert self._scan(chunks) == text
+    
+    def test_text_before_object_is_ignored(self):
+        # Chave/aspas soltas antes do objeto não contam profundidade
+        assert self._scan(['nota "}" ', '{"a": 1}', " depois"]) == 'nota "}" {"a": 1}'
+    
+    def test_unclosed_object(self):
+        assert self._scan(['{"a": {"b": 1}', ' "c": 2']) is None
+
+
+class TestParseLlmResponse:
+    """_parse_llm_response: JSON puro, com texto em volta e fallback."""
+    
+    @pytest.mark.parametrize("response,expected", [
+        ('{"decision": "HOLD"}', {"decision": "HOLD"}),
+        ('```json\n{"decision": "ENTRY", "x": {"y": 1}}\n```', {"decision": "ENTRY", "x": {"y": 1}}),
+        ('Veredito: {"reasoning": "a } b \\" c"} fim', {"reasoning": 'a } b " c'}),
+        ('{"decision": "HOLD"} texto extra', {"decision": "HOLD"}),
+    ])
+    def test_extracts_object(self, response, expected):
+        from agents.risk_commander import risk_commander
+        
+        assert risk_commander._parse_llm_response(response) == (expected, True)
+    
+    @pytest.mark.parametrize("response", ["nada", '{"decision": ', '{"a": } }'])
+    def test_fallback_is_not_ok(self, response):
+        from agents.risk_commander import risk_commander
+        
+        decision, parse_ok = risk_commander._parse_llm_response(response)
+        
+        assert parse_ok is False
+        assert decision["decision"] == "HOLD"
+        assert decision["direction"] is None
+    
+    @pytest.mark.asyncio
+    async def test_stream_stops_when_object_closes(self, monkeypatch):
+        """_stream_cio corta no fechamento e fecha o stream do provedor."""
+        from agents.risk_commander import risk_commander
+        
+        text = '{"decision": "ENTRY", "reasoning": "topo {duplo}"}'
+        llm = _ChunkedLLM([text[:20], text[20:-1], text[-1] + "\n```", "nunca lido"])
+        monkeypatch.setattr(risk_commander, "_llm", llm)
+        
+        content = await risk_commander._stream_cio("prompt", None)
+        
+        assert content == text
+        assert llm.consumed == 3
+        assert llm.closed is True
+
+
+class TestPruneForPrompt:
+    """_prune_for_prompt: poda do prompt sem apagar leituras de mercado."""
+    
+    def test_keeps_market_readings(self):
+        from agents.risk_commander import _prune_for_prompt
+        
+        data = {
+            "score": 0,
+            "confluence_score": 0.0,
+            "should_trade": False,
+            "divergence_warning": False,
+            "signal": "NEUTRAL"
+        }
+        
+        assert _prune_for_prompt(data) == data
+    
+    def test_drops_empty_values(self):
+        from agents.risk_commander import _prune_for_prompt
+        
+        data = {
+            "message": "",
+            "headlines": [],
+            "timeframes": {},
+            "trend": None,
+            "nested": {"reasons": [], "note": None},
+            "signals": ["", None, "BUY", {}],
+            "rsi": 55.2
+        }
+        
+        assert _prune_for_prompt(data) == {"signals": ["BUY"], "rsi": 55.2}
+    
+    def test_truncates_long_strings(self):
+        from agents.risk_commander import _PROMPT_STR_MAX, _prune_for_prompt
+        
+        pruned = _prune_for_prompt({"llm_reasoning": "x" * (_PROMPT_STR_MAX + 50)})
+        
+        assert pruned["llm_reasoning"] == "x" * _PROMPT_STR_MAX + "..."
+
+
+class TestRiskReward:
+    """_risk_reward: mesma fórmula para BUY e SELL."""
+    
+    @pytest.mark.parametrize("entry,take_profit,stop_loss,expected", [
+        (1.1000, 1.1020, 1.0990, 2.0),  # BUY: TP acima, SL abaixo
+        (1.1000, 1.0980, 1.1010, 2.0),  # SELL: TP abaixo, SL acima
+        (1.1000, 1.1015, 1.0990, 1.5),
+    ])
+    def test_ratio(self, entry, take_profit, stop_loss, expected):
+        from agents.risk_commander import _risk_reward
+        
+        assert _risk_reward(entry, take_profit, stop_loss) == expected
+    
+    @pytest.mark.parametrize("entry,take_profit,stop_loss", [
+        (1.1000, 0, 1.0990),       # HOLD sem TP
+        (1.1000, 1.1020, 0),       # sem SL
+        (1.1000, 1.1020, 1.1000),  # SL na entrada
+    ])
+    def test_undefined_levels(self, entry, take_profit, stop_loss):
+        from agents.risk_commander import _risk_reward
+        
+        assert _risk_reward(entry, take_profit, stop_loss) == 0
@@ -5,8 +5,11 @@ Sistema de logging estruturado usando structlog.
 Logs são salvos em arquivo e exibidos no console.
 """
 
+import atexit
 import logging
+import queue
 import sys
+import threading
 from pathlib import Path
 
 import structlog
@@ -16,6 +19,47 @@ from rich.logging import RichHandler
 from core.config import settings
 
 
+# Renderização e escrita rodam numa thread dedicada: o event loop só
+# enfileira o event dict e volta a aguardar I/O
+_LOG_QUEUE: queue.SimpleQueue = queue.SimpleQueue()
+_STOP = object()
+_RENDERER = structlog.dev.ConsoleRenderer(colors=True)
+
+
+class _QueuedPrintLogger:
+    """Logger final do structlog que apenas enfileira o event dict."""
+    
+    def msg(self, **event_dict) -> None:
+        _LOG_QUEUE.put(event_dict)
+    
+    log = debug = info = warn = warning = error = critical = exception = fatal = msg
+
+
+def _resolve_exc_info(logger, method_name: str, event_dict: dict) -> dict:
+    """Captura sys.exc_info() na thread de origem (a renderização é adiada)."""
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+
+def _drain_log_queue() -> None:
+    """Consome a fila de logs: renderiza e imprime no stdout."""
+    while (event_dict := _LOG_QUEUE.get()) is not _STOP:
+        try:
+            print(_RENDERER(None, event_dict.get("level", "info"), event_dict), flush=True)
+        except Exception as e:
+            print(f"[logger] failed to render log event: {e}", file=sys.stderr)
+
+
+_LOG_THREAD = threading.Thread(target=_drain_log_queue, name="3v-logger", daemon=True)
+
+
+def _flush_logs() -> None:
+    """Esvazia a fila de logs no encerramento do processo."""
+    _LOG_QUEUE.put(_STOP)
+    _LOG_THREAD.join(timeout=5.0)
+
+
 def setup_logger() -> structlog.BoundLogger:
     """
     Configura e retorna o logger estruturado do sistema.
@@ -51,17 +95,22 @@ def setup_logger() -> structlog.BoundLogger:
             structlog.processors.add_log_level,
             structlog.processors.StackInfoRenderer(),
             structlog.dev.set_exc_info,
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.dev.ConsoleRenderer(colors=True)
+            _resolve_exc_info,
+            structlog.processors.TimeStamper(fmt="iso")
+            # Sem renderer aqui: o event dict segue para _QueuedPrintLogger
         ],
         wrapper_class=structlog.make_filtering_bound_logger(
             getattr(logging, settings.log_level)
         ),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=lambda *args: _QueuedPrintLogger(),
         cache_logger_on_first_use=True
     )
     
+    if not _LOG_THREAD.is_alive():
+        _LOG_THREAD.start()
+        atexit.register(_flush_logs)
+    
     return structlog.get_logger("3v_engine")
 
 
@@ -6,6 +6,7 @@ Fornece dados OHLCV e indicadores técnicos em tempo real.
 """
 
 import asyncio
+import time
 from datetime import datetime
 from typing import Any
 
@@ -29,11 +30,24 @@ class TwelveDataClient:
     MAX_RETRIES = 3
     RETRY_DELAY = 8.0  # segundos entre retries
     
+    # Cache das análises: ciclos próximos reaproveitam o resultado (menos chamadas)
+    TECHNICAL_TTL = 5.0   # segundos (get_technical_analysis)
+    MTF_TTL = 30.0        # segundos (get_multi_timeframe_analysis, 4 timeframes)
+    
     def __init__(self) -> None:
         self._base_url = settings.twelve_data_base_url
         self._api_key = settings.twelve_data_api_key
         # Forex deve usar símbolo COM barra: EUR/USD
         self._symbol = settings.trading_pair  # Mantém EUR/USD
+        # chave -> (resultado, time.monotonic()); resultados são só leitura
+        self._analysis_cache: dict[tuple, tuple[dict[str, Any], float]] = {}
+    
+    def _cached(self, key: tuple, ttl: float) -> dict[str, Any] | None:
+        """Retorna o resultado em cache para key se ainda dentro do TTL."""
+        cached = self._analysis_cache.get(key)
+        if cached is not None and time.monotonic() - cached[1] < ttl:
+            return cached[0]
+        return None
     
     async def _request(
         self,
@@ -123,9 +137,14 @@ class TwelveDataClient:
         
         return df
     
-    async def get_current_price(self) -> dict[str, float]:
-        """Obtém preço atual do par com retry logic."""
-        data = await self._request("price", {"symbol": self._symbol})
+    async def get_current_price(self, symbol: str | None = None) -> dict[str, float]:
+        """
+        Obtém preço atual do par com retry logic.
+        
+        Args:
+            symbol: Par de moedas (ex: EUR/USD). Default: configuração global
+        """
+        data = await self._request("price", {"symbol": symbol or self._symbol})
         return {"price": float(data["price"])}
     
     def calculate_moving_averages(
@@ -148,7 +167,7 @@ class TwelveDataClient:
         
         for period in periods:
             if len(df) >= period:
-                ma = df["close"].tail(period).mean()
+                ma = float(df["close"].tail(period).mean())
                 result[f"MA_{period}"] = round(ma, 5)
             else:
                 result[f"MA_{period}"] = None
@@ -231,7 +250,7 @@ class TwelveDataClient:
         rs = gain / loss
         rsi = 100 - (100 / (1 + rs))
         
-        current_rsi = round(rsi.iloc[-1], 2)
+        current_rsi = round(float(rsi.iloc[-1]), 2)
         
         if current_rsi >= 70:
             zone = "OVERBOUGHT"
@@ -282,7 +301,7 @@ class TwelveDataClient:
         true_range = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
         
         # ATR = SMA do True Range
-        atr = true_range.rolling(window=period).mean().iloc[-1]
+        atr = float(true_range.rolling(window=period).mean().iloc[-1])
         atr_rounded = round(atr, 5)
         
         # Converte ATR para pips (1 pip = 0.0001 para EUR/USD)
@@ -349,9 +368,9 @@ class TwelveDataClient:
         lower = sma - (std * std_dev)
         
         current_price = df["close"].iloc[-1]
-        current_upper = round(upper.iloc[-1], 5)
-        current_lower = round(lower.iloc[-1], 5)
-        current_middle = round(sma.iloc[-1], 5)
+        current_upper = round(float(upper.iloc[-1]), 5)
+        current_lower = round(float(lower.iloc[-1]), 5)
+        current_middle = round(float(sma.iloc[-1]), 5)
         
         # Posição relativa do preço nas bandas
         if current_price >= current_upper:
@@ -466,6 +485,11 @@ class TwelveDataClient:
         # Permite override do símbolo para multi-pair scanner
         target_symbol = symbol or self._symbol.replace("/", "")
         
+        cache_key = ("technical", target_symbol, interval, outputsize)
+        cached = self._cached(cache_key, self.TECHNICAL_TTL)
+        if cached is not None:
+            return cached
+        
         log_agent_action("@TwelveData", "Running full technical analysis", {
             "symbol": target_symbol,
             "interval": interval
@@ -488,7 +512,7 @@ class TwelveDataClient:
             df[col] = pd.to_numeric(df[col], errors="coerce")
         df = df.sort_values("datetime").reset_index(drop=True)
         
-        current_price = df["close"].iloc[-1]
+        current_price = float(df["close"].iloc[-1])
         
         # Calcula indicadores
         moving_averages = self.calculate_moving_averages(df)
@@ -502,7 +526,7 @@ class TwelveDataClient:
             if "atr_pips" in atr:
                 atr["atr_pips"] = atr.get("atr", 0) / 0.01  # JPY usa 0.01
         
-        return {
+        result = {
             "timestamp": datetime.now().isoformat(),
             "symbol": target_symbol,
             "price": round(current_price, 5),
@@ -514,6 +538,8 @@ class TwelveDataClient:
             "candlestick_patterns": patterns,
             "candles_analyzed": len(df)
         }
+        self._analysis_cache[cache_key] = (result, time.monotonic())
+        return result
     
     async def get_multi_timeframe_analysis(self) -> dict[str, Any]:
         """
@@ -528,6 +554,11 @@ class TwelveDataClient:
         Returns:
             Dict com análise de cada TF e score de confluência
         """
+        cache_key = ("mtf", self._symbol)
+        cached = self._cached(cache_key, self.MTF_TTL)
+        if cached is not None:
+            return cached
+        
         log_agent_action("@TwelveData", "Running Multi-Timeframe Analysis (MTF)")
         
         timeframes = {
@@ -548,7 +579,7 @@ class TwelveDataClient:
                 df = await self.get_price_data(interval=interval, outputsize=100)
                 
                 if current_price is None:
-                    current_price = df["close"].iloc[-1]
+                    current_price = float(df["close"].iloc[-1])
                 
                 # Calcula indicadores para este TF
                 ma = self.calculate_moving_averages(df, periods=[20, 50])
@@ -597,13 +628,15 @@ class TwelveDataClient:
         # Calcula confluência entre timeframes
         confluence = self._calculate_confluence(mtf_data)
         
-        return {
+        result = {
             "timestamp": datetime.now().isoformat(),
             "symbol": settings.trading_pair,
             "current_price": round(current_price, 5) if current_price else 0,
             "timeframes": mtf_data,
             "confluence": confluence
         }
+        self._analysis_cache[cache_key] = (result, time.monotonic())
+        return result
     
     def _calculate_tf_signal(
         self,